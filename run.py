@@ -2,9 +2,14 @@ import sys
 import subprocess
 import socket
 import importlib.util
-import platform
-import time
 import os
+import re
+import json
+import time
+import hashlib
+import sysconfig
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 class ConsoleUI:
     @staticmethod
@@ -44,32 +49,16 @@ class ConsoleUI:
         if not rows:
             return
 
-        col_widths = [len(str(h)) for h in headers]
-        for row in rows:
-            for i, cell in enumerate(row):
-                if i < len(col_widths):
-                    col_widths[i] = max(col_widths[i], len(str(cell)))
-
-        header_line = "  "
-        separator_line = "  "
-        for i, header in enumerate(headers):
-            header_line += str(header).ljust(col_widths[i])
-            if i < len(headers) - 1:
-                header_line += " │ "
-                separator_line += "─" * col_widths[i] + "─┼─"
-            else:
-                separator_line += "─" * col_widths[i]
+        col_widths = [
+            max([len(str(header))] + [len(str(row[i])) for row in rows if i < len(row)])
+            for i, header in enumerate(headers)
+        ]
 
-        print(header_line)
-        print(separator_line)
+        print("  " + " │ ".join(str(header).ljust(w) for header, w in zip(headers, col_widths)))
+        print("  " + "─┼─".join("─" * w for w in col_widths))
 
         for row in rows:
-            row_line = "  "
-            for i, cell in enumerate(row):
-                row_line += str(cell).ljust(col_widths[i])
-                if i < len(row) - 1:
-                    row_line += " │ "
-            print(row_line)
+            print("  " + " │ ".join(str(cell).ljust(w) for cell, w in zip(row, col_widths)))
 
 def check_python_version():
     if sys.version_info < (3, 7):
@@ -80,7 +69,60 @@ def check_python_version():
     ConsoleUI.print_status(f"Python {version}", "success")
     return True
 
+DEPENDENCY_CACHE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'urdf-commit-viewer',
+    'deps.json'
+)
+DEPENDENCY_CACHE_TTL = 24 * 60 * 60
+
+def get_dependency_cache_key():
+    try:
+        site_mtime = os.path.getmtime(sysconfig.get_path("purelib"))
+    except (OSError, TypeError):
+        site_mtime = 0
+    return hashlib.sha1(f"{sys.executable}:{site_mtime}".encode()).hexdigest()
+
+def load_dependency_cache():
+    try:
+        with open(DEPENDENCY_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or cache.get('key') != get_dependency_cache_key():
+        return None
+    if time.time() - cache.get('time', 0) > DEPENDENCY_CACHE_TTL:
+        return None
+
+    return [tuple(item) for item in cache.get('installed', [])]
+
+def save_dependency_cache(installed):
+    try:
+        os.makedirs(os.path.dirname(DEPENDENCY_CACHE_FILE), exist_ok=True)
+        with open(DEPENDENCY_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'key': get_dependency_cache_key(),
+                'time': time.time(),
+                'installed': installed
+            }, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+def clear_dependency_cache():
+    try:
+        os.remove(DEPENDENCY_CACHE_FILE)
+    except OSError:
+        pass
+
 def check_dependencies():
+    ConsoleUI.print_section("ПРОВЕРКА ЗАВИСИМОСТЕЙ")
+
+    cached = load_dependency_cache()
+    if cached is not None:
+        ConsoleUI.print_status("Результат проверки взят из кэша", "info")
+        return [], cached
+
     dependencies = [
         ('streamlit', 'streamlit', 'Веб-интерфейс'),
         ('git', 'gitpython', 'Работа с Git'),
@@ -92,13 +134,13 @@ def check_dependencies():
         ('OpenGL', 'PyOpenGL', '3D визуализация'),
     ]
 
-    ConsoleUI.print_section("ПРОВЕРКА ЗАВИСИМОСТЕЙ")
-
     missing = []
     installed = []
 
-    for module, package, description in dependencies:
-        spec = importlib.util.find_spec(module)
+    with ThreadPoolExecutor(max_workers=min(8, len(dependencies))) as executor:
+        specs = list(executor.map(lambda dep: importlib.util.find_spec(dep[0]), dependencies))
+
+    for (module, package, description), spec in zip(dependencies, specs):
         if spec is None:
             if package == 'PyOpenGL':
                 try:
@@ -117,6 +159,9 @@ def check_dependencies():
             installed.append((package, description))
             ConsoleUI.print_status(f"{package}: {description}", "success")
 
+    if not missing:
+        save_dependency_cache(installed)
+
     return missing, installed
 
 def install_dependencies(missing):
@@ -125,39 +170,52 @@ def install_dependencies(missing):
 
     ConsoleUI.print_section("УСТАНОВКА ЗАВИСИМОСТЕЙ")
 
-    for package, description in missing:
-        ConsoleUI.print_status(f"Установка {package}...", "loading")
+    packages = [package for package, _ in missing]
+    ConsoleUI.print_status(f"Установка {', '.join(packages)}...", "loading")
 
-        try:
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "install", package],
-                capture_output=True,
-                text=True,
-                check=False
-            )
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "pip", "install",
+             "--disable-pip-version-check", "--no-input", *packages],
+            capture_output=True,
+            text=True,
+            check=False,
+            close_fds=False
+        )
 
-            time.sleep(0.5)
+    except Exception as e:
+        ConsoleUI.print_status(f"Исключение: {str(e)[:50]}", "error")
+        return False
 
-            if result.returncode == 0:
-                ConsoleUI.print_status(f"{package} установлен", "success")
-            else:
-                ConsoleUI.print_status(f"Ошибка установки {package}", "error")
-                if result.stderr:
-                    error_msg = result.stderr[:100].strip()
-                    if error_msg:
-                        print(f"      {error_msg}")
-                return False
+    if result.returncode != 0:
+        ConsoleUI.print_status(f"Ошибка установки {', '.join(packages)}", "error")
+        if result.stderr:
+            error_msg = result.stderr[:100].strip()
+            if error_msg:
+                print(f"      {error_msg}")
+        return False
 
-        except Exception as e:
-            ConsoleUI.print_status(f"Исключение: {str(e)[:50]}", "error")
-            return False
+    for package in packages:
+        ConsoleUI.print_status(f"{package} установлен", "success")
 
+    clear_dependency_cache()
     return True
 
+def read_system_info():
+    if hasattr(os, 'uname'):
+        uname = os.uname()
+        return uname.sysname, uname.release, uname.machine
+
+    try:
+        import platform
+        return platform.system(), platform.release(), platform.machine()
+    except Exception:
+        return sys.platform, '', ''
+
+SYSTEM_INFO = read_system_info()
+
 def get_system_info():
-    system = platform.system()
-    release = platform.release()
-    machine = platform.machine()
+    system, release, machine = SYSTEM_INFO
 
     return [
         ("Система", f"{system} {release}"),
@@ -166,19 +224,36 @@ def get_system_info():
     ]
 
 def find_free_port(start_port=8501):
-    for port in range(start_port, start_port + 20):
+    for port in (start_port, 0):
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(('127.0.0.1', port))
-            sock.close()
-
-            if result != 0:
-                return port
-        except:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(('127.0.0.1', port))
+                return sock.getsockname()[1]
+        except OSError:
             continue
     return start_port
 
+OUTPUT_FILTER_RE = re.compile(r'Network URL|External URL|ERROR|Exception')
+
+def drain_output(stream):
+    for line in iter(stream.readline, ''):
+        if OUTPUT_FILTER_RE.search(line):
+            print(f"  {line.strip()}")
+
+def get_streamlit_options(port):
+    return {
+        "server.port": port,
+        "server.headless": False,
+        "browser.gatherUsageStats": False,
+        "theme.base": "light",
+        "server.enableCORS": False,
+        "server.enableXsrfProtection": False,
+        "logger.level": "error",
+        "client.showErrorDetails": False,
+        "global.developmentMode": False,
+    }
+
 def start_application(port):
     ConsoleUI.print_section("ЗАПУСК ПРИЛОЖЕНИЯ")
 
@@ -192,45 +267,60 @@ def start_application(port):
     print(f"\nℹ Для остановки нажмите Ctrl+C")
     print("=" * 50)
 
+    options = get_streamlit_options(port)
+
+    try:
+        from streamlit.web import bootstrap
+    except ImportError:
+        return start_application_subprocess(options)
+
+    flag_options = {name.replace('.', '_'): value for name, value in options.items()}
+
+    try:
+        ConsoleUI.print_status("Приложение запущено", "success")
+        print()
+
+        bootstrap.load_config_options(flag_options=flag_options)
+        bootstrap.run("urdf-viewer.py", "", [], flag_options)
+
+    except KeyboardInterrupt:
+        ConsoleUI.print_status("\nОстановка приложения...", "warning")
+        ConsoleUI.print_status("Приложение остановлено", "success")
+
+    except Exception as e:
+        ConsoleUI.print_status(f"Ошибка запуска: {str(e)}", "error")
+        return False
+
+    return True
+
+def start_application_subprocess(options):
     env = os.environ.copy()
     env['STREAMLIT_SERVER_HEADLESS'] = 'true'
     env['STREAMLIT_BROWSER_GATHER_USAGE_STATS'] = 'false'
     env['STREAMLIT_SERVER_ENABLE_CORS'] = 'false'
     env['STREAMLIT_SERVER_ENABLE_XSRF_PROTECTION'] = 'false'
 
-    cmd = [
-        sys.executable, "-m", "streamlit", "run",
-        "urdf-viewer.py",
-        "--server.port", str(port),
-        "--server.headless", "false",
-        "--browser.gatherUsageStats", "false",
-        "--theme.base", "light",
-        "--server.enableCORS", "false",
-        "--server.enableXsrfProtection", "false",
-        "--logger.level", "error",
-        "--client.showErrorDetails", "false",
-        "--global.developmentMode", "false"
-    ]
+    cmd = [sys.executable, "-m", "streamlit", "run", "urdf-viewer.py"]
+    for name, value in options.items():
+        cmd += [f"--{name}", str(value).lower() if isinstance(value, bool) else str(value)]
+
+    process = None
 
     try:
-        with open(os.devnull, 'w') as devnull:
-            process = subprocess.Popen(
-                cmd,
-                env=env,
-                stdout=subprocess.PIPE,
-                stderr=devnull,
-                text=True,
-                bufsize=1
-            )
+        process = subprocess.Popen(
+            cmd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=65536,
+            close_fds=False
+        )
 
         ConsoleUI.print_status("Приложение запущено", "success")
         print()
 
-        for line in process.stdout:
-            if "Network URL" in line or "External URL" in line:
-                print(f"  {line.strip()}")
-            elif "ERROR" in line or "Exception" in line:
-                print(f"  {line.strip()}")
+        threading.Thread(target=drain_output, args=(process.stdout,), daemon=True).start()
 
         process.wait()
 
@@ -1,8 +1,10 @@
 import sys
-import threading
+import re
+import ctypes
+import multiprocessing as mp
 import tempfile
 import os
-import re
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
 try:
@@ -15,12 +17,51 @@ try:
 except ImportError:
     OPENGL_AVAILABLE = False
 
+try:
+    import OpenGL_accelerate
+    OPENGL_ACCELERATE_AVAILABLE = True
+except ImportError:
+    OPENGL_ACCELERATE_AVAILABLE = False
+
 try:
     import numpy as np
     NUMPY_AVAILABLE = True
 except ImportError:
     NUMPY_AVAILABLE = False
 
+if NUMPY_AVAILABLE:
+    LIGHT_POSITION = np.array([5.0, 5.0, 5.0, 1.0], dtype=np.float32)
+    MATERIAL_SPECULAR = np.array([1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+    MATERIAL_SHININESS = np.array([50.0], dtype=np.float32)
+    MATERIAL_AMBIENT = np.array([0.1, 0.1, 0.1, 1.0], dtype=np.float32)
+    MATERIAL_DIFFUSE = np.array([0.7, 0.7, 0.7, 1.0], dtype=np.float32)
+
+VERTEX_STRIDE = 24
+SCENE_STRIDE = 40
+
+def array_pointer(array, offset=0):
+    return ctypes.c_void_p(array.ctypes.data + offset)
+
+BOX_FACES = (
+    ((0.0, 0.0, 1.0), ((-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1))),
+    ((0.0, 0.0, -1.0), ((-1, -1, -1), (-1, 1, -1), (1, 1, -1), (1, -1, -1))),
+    ((0.0, 1.0, 0.0), ((-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1))),
+    ((0.0, -1.0, 0.0), ((-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1))),
+    ((1.0, 0.0, 0.0), ((1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1))),
+    ((-1.0, 0.0, 0.0), ((-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1))),
+)
+
+QUAD_TO_TRIANGLES = [0, 1, 2, 0, 2, 3]
+
+LINK_TYPE_RE = re.compile(
+    r'(?=.*(?:base|root)(?P<base>))'
+    r'|(?=.*wheel(?P<wheel>))'
+    r'|(?=.*(?:camera|sensor|lidar)(?P<sensor>))'
+    r'|(?=.*(?:gripper|hand|finger)(?P<gripper>))'
+    r'|(?=.*joint(?P<joint>))',
+    re.DOTALL
+)
+
 class URDF3DViewer:
     def __init__(self, urdf_content, title="URDF 3D Viewer"):
         self.urdf_content = urdf_content
@@ -36,10 +77,6 @@ class URDF3DViewer:
         self.last_y = 0
         self.mouse_down = False
 
-        self.links = []
-        self.joints = []
-        self.parse_urdf()
-
         self.colors = {
             'base': (0.2, 0.4, 0.8, 1.0),
             'link': (0.4, 0.8, 0.2, 1.0),
@@ -50,93 +87,143 @@ class URDF3DViewer:
             'default': (0.7, 0.7, 0.7, 1.0)
         }
 
+        self.links = []
+        self.joints = []
+        self._geometry_cache = {}
+        self._mesh_cache = {}
+        self._vertex_cache = {}
+        self._line_cache = {}
+        self._scene = None
+        self._scene_vbo = None
+        self.parse_urdf()
+
+        if NUMPY_AVAILABLE:
+            self.build_scene()
+
     def parse_urdf(self):
         if not self.urdf_content:
             return
 
-        link_pattern = r'<link\s+name="([^"]+)"(.*?)</link>'
-        for match in re.finditer(link_pattern, self.urdf_content, re.DOTALL):
-            link_name = match.group(1)
-            link_content = match.group(2)
+        try:
+            root = ET.fromstring(self.urdf_content)
+        except ET.ParseError as e:
+            print(f"Ошибка разбора URDF: {e}")
+            return
+
+        for link in root.findall('link'):
+            link_name = link.get('name')
+            if not link_name:
+                continue
 
-            geometry = self.parse_geometry(link_content)
+            visual = link.find('visual')
+            if visual is None:
+                visual = link.find('collision')
 
-            origin = self.parse_origin(link_content)
+            geometry = self.parse_geometry(visual)
+            geometry_key = self.get_geometry_key(geometry)
+            geometry = self._geometry_cache.setdefault(geometry_key, geometry)
+
+            origin = self.parse_origin(visual)
+
+            link_type = self.get_link_type(link_name)
 
             self.links.append({
                 'name': link_name,
                 'geometry': geometry,
+                'geometry_key': geometry_key,
                 'origin': origin,
-                'type': self.get_link_type(link_name)
+                'matrix': self.build_transform(origin['xyz'], origin['rpy']),
+                'type': link_type,
+                'color': (ctypes.c_float * 4)(*self.colors.get(link_type, self.colors['default']))
             })
 
-        joint_pattern = r'<joint\s+name="([^"]+)"(.*?)</joint>'
-        for match in re.finditer(joint_pattern, self.urdf_content, re.DOTALL):
-            joint_content = match.group(2)
-
-            parent_match = re.search(r'<parent\s+link="([^"]+)"', joint_content)
-            child_match = re.search(r'<child\s+link="([^"]+)"', joint_content)
+        for joint in root.findall('joint'):
+            parent = joint.find('parent')
+            child = joint.find('child')
 
-            if parent_match and child_match:
-                origin = self.parse_origin(joint_content)
+            if parent is not None and child is not None and parent.get('link') and child.get('link'):
+                origin = self.parse_origin(joint)
 
                 self.joints.append({
-                    'parent': parent_match.group(1),
-                    'child': child_match.group(1),
+                    'parent': parent.get('link'),
+                    'child': child.get('link'),
                     'origin': origin
                 })
 
-    def parse_geometry(self, content):
-        box_match = re.search(r'<box\s+size="([\d\.\s]+)"', content)
-        if box_match:
-            sizes = list(map(float, box_match.group(1).split()))
-            if len(sizes) >= 3:
-                return {'type': 'box', 'size': sizes[:3]}
-
-        cylinder_match = re.search(r'<cylinder\s+radius="([\d\.]+)"\s+length="([\d\.]+)"', content)
-        if cylinder_match:
-            return {
-                'type': 'cylinder',
-                'radius': float(cylinder_match.group(1)),
-                'length': float(cylinder_match.group(2))
-            }
-
-        sphere_match = re.search(r'<sphere\s+radius="([\d\.]+)"', content)
-        if sphere_match:
-            return {'type': 'sphere', 'radius': float(sphere_match.group(1))}
+    def parse_vector(self, value, size=3):
+        try:
+            values = [float(v) for v in (value or '').split()]
+        except ValueError:
+            return None
 
-        return {'type': 'box', 'size': [0.1, 0.1, 0.1]}
+        if len(values) < size:
+            return None
 
-    def parse_origin(self, content):
-        origin_match = re.search(r'<origin\s+xyz="([-\d\.\s]+)"(?:\s+rpy="([-\d\.\s]+)")?', content)
-        if origin_match:
-            xyz = list(map(float, origin_match.group(1).split()))
-            if len(xyz) < 3:
-                xyz = [0.0, 0.0, 0.0]
+        return values[:size]
 
-            if origin_match.group(2):
-                rpy = list(map(float, origin_match.group(2).split()))
-            else:
-                rpy = [0.0, 0.0, 0.0]
+    def parse_float(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def parse_geometry(self, element):
+        geometry = element.find('geometry') if element is not None else None
+
+        if geometry is not None:
+            box = geometry.find('box')
+            if box is not None:
+                sizes = self.parse_vector(box.get('size'))
+                if sizes:
+                    return {'type': 'box', 'size': sizes}
+
+            cylinder = geometry.find('cylinder')
+            if cylinder is not None:
+                radius = self.parse_float(cylinder.get('radius'))
+                length = self.parse_float(cylinder.get('length'))
+                if radius is not None and length is not None:
+                    return {'type': 'cylinder', 'radius': radius, 'length': length}
+
+            sphere = geometry.find('sphere')
+            if sphere is not None:
+                radius = self.parse_float(sphere.get('radius'))
+                if radius is not None:
+                    return {'type': 'sphere', 'radius': radius}
+
+        return {'type': 'box', 'size': [0.1, 0.1, 0.1]}
 
-            return {'xyz': xyz[:3], 'rpy': rpy[:3]}
+    def parse_origin(self, element):
+        origin = element.find('origin') if element is not None else None
+
+        if origin is not None:
+            xyz = self.parse_vector(origin.get('xyz')) or [0.0, 0.0, 0.0]
+            rpy = self.parse_vector(origin.get('rpy')) or [0.0, 0.0, 0.0]
+            return {'xyz': xyz, 'rpy': rpy}
 
         return {'xyz': [0.0, 0.0, 0.0], 'rpy': [0.0, 0.0, 0.0]}
 
+    def build_transform(self, xyz, rpy):
+        if not NUMPY_AVAILABLE:
+            return None
+
+        roll, pitch, yaw = rpy
+        cr, sr = np.cos(roll), np.sin(roll)
+        cp, sp = np.cos(pitch), np.sin(pitch)
+        cy, sy = np.cos(yaw), np.sin(yaw)
+
+        rz = np.array([[cy, -sy, 0.0], [sy, cy, 0.0], [0.0, 0.0, 1.0]])
+        ry = np.array([[cp, 0.0, sp], [0.0, 1.0, 0.0], [-sp, 0.0, cp]])
+        rx = np.array([[1.0, 0.0, 0.0], [0.0, cr, -sr], [0.0, sr, cr]])
+
+        transform = np.identity(4)
+        transform[:3, :3] = rz @ ry @ rx
+        transform[:3, 3] = xyz
+
+        return np.ascontiguousarray(transform.T, dtype=np.float32)
+
     def get_link_type(self, link_name):
-        name_lower = link_name.lower()
-        if 'base' in name_lower or 'root' in name_lower:
-            return 'base'
-        elif 'wheel' in name_lower:
-            return 'wheel'
-        elif 'camera' in name_lower or 'sensor' in name_lower or 'lidar' in name_lower:
-            return 'sensor'
-        elif 'gripper' in name_lower or 'hand' in name_lower or 'finger' in name_lower:
-            return 'gripper'
-        elif 'joint' in name_lower:
-            return 'joint'
-        else:
-            return 'link'
+        match = LINK_TYPE_RE.match(link_name.lower())
+        return match.lastgroup if match else 'link'
 
     def init_gl(self):
         glClearColor(0.1, 0.1, 0.1, 1.0)
@@ -146,182 +233,277 @@ class URDF3DViewer:
         glEnable(GL_COLOR_MATERIAL)
         glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
 
-        light_position = [5.0, 5.0, 5.0, 1.0]
-        glLightfv(GL_LIGHT0, GL_POSITION, light_position)
+        glLightfv(GL_LIGHT0, GL_POSITION, LIGHT_POSITION)
+
+        glMaterialfv(GL_FRONT, GL_SPECULAR, MATERIAL_SPECULAR)
+        glMaterialfv(GL_FRONT, GL_SHININESS, MATERIAL_SHININESS)
+        glMaterialfv(GL_FRONT, GL_AMBIENT, MATERIAL_AMBIENT)
+        glMaterialfv(GL_FRONT, GL_DIFFUSE, MATERIAL_DIFFUSE)
+
+    def build_axis_vertices(self):
+        return np.array([
+            (0.0, 0.0, 0.0, 1.0, 0.0, 0.0), (1.0, 0.0, 0.0, 1.0, 0.0, 0.0),
+            (0.0, 0.0, 0.0, 0.0, 1.0, 0.0), (0.0, 1.0, 0.0, 0.0, 1.0, 0.0),
+            (0.0, 0.0, 0.0, 0.0, 0.0, 1.0), (0.0, 0.0, 1.0, 0.0, 0.0, 1.0),
+        ], dtype=np.float32)
+
+    def build_grid_vertices(self, size, step):
+        ticks = np.arange(-size, size + 1, step, dtype=np.float32)
+        edge = np.full_like(ticks, size)
+        zero = np.zeros_like(ticks)
+
+        endpoints = np.stack((
+            np.stack((-edge, zero, ticks), axis=1),
+            np.stack((edge, zero, ticks), axis=1),
+            np.stack((ticks, zero, -edge), axis=1),
+            np.stack((ticks, zero, edge), axis=1),
+        ), axis=1).reshape(-1, 3)
+
+        colors = np.full_like(endpoints, 0.5)
+        return np.ascontiguousarray(np.hstack((endpoints, colors)), dtype=np.float32)
+
+    def draw_lines(self, key, build):
+        lines = self._line_cache.get(key)
+        if lines is None:
+            vertices = build()
+            vbo = None
+            if bool(glGenBuffers):
+                vbo = glGenBuffers(1)
+                glBindBuffer(GL_ARRAY_BUFFER, vbo)
+                glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+                glBindBuffer(GL_ARRAY_BUFFER, 0)
+            lines = (vbo, vertices)
+            self._line_cache[key] = lines
+
+        vbo, vertices = lines
 
-        glMaterialfv(GL_FRONT, GL_SPECULAR, [1.0, 1.0, 1.0, 1.0])
-        glMaterialfv(GL_FRONT, GL_SHININESS, [50.0])
-        glMaterialfv(GL_FRONT, GL_AMBIENT, [0.1, 0.1, 0.1, 1.0])
-        glMaterialfv(GL_FRONT, GL_DIFFUSE, [0.7, 0.7, 0.7, 1.0])
-
-    def draw_axis(self):
         glDisable(GL_LIGHTING)
-        glBegin(GL_LINES)
-
-        glColor3f(1.0, 0.0, 0.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        glVertex3f(1.0, 0.0, 0.0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
 
-        glColor3f(0.0, 1.0, 0.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        glVertex3f(0.0, 1.0, 0.0)
+        if vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+            glColorPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(12))
+        else:
+            glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, array_pointer(vertices))
+            glColorPointer(3, GL_FLOAT, VERTEX_STRIDE, array_pointer(vertices, 12))
 
-        glColor3f(0.0, 0.0, 1.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        glVertex3f(0.0, 0.0, 1.0)
+        glDrawArrays(GL_LINES, 0, len(vertices))
 
-        glEnd()
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         glEnable(GL_LIGHTING)
 
+    def draw_axis(self):
+        self.draw_lines(('axis',), self.build_axis_vertices)
+
     def draw_grid(self, size=10, step=1):
-        glDisable(GL_LIGHTING)
-        glColor3f(0.5, 0.5, 0.5)
-        glBegin(GL_LINES)
+        self.draw_lines(('grid', size, step), lambda: self.build_grid_vertices(size, step))
 
-        for i in range(-size, size + 1, step):
-            glVertex3f(-size, 0.0, i)
-            glVertex3f(size, 0.0, i)
+    def get_geometry_key(self, geometry):
+        if geometry['type'] == 'box':
+            return ('box',) + tuple(round(v, 6) for v in geometry['size'][:3])
+        elif geometry['type'] == 'cylinder':
+            return ('cylinder', round(geometry['radius'], 6), round(geometry['length'], 6))
+        elif geometry['type'] == 'sphere':
+            return ('sphere', round(geometry['radius'], 6))
+        return ('box', 0.1, 0.1, 0.1)
+
+    def build_box_vertices(self, size):
+        corners = np.array([face[1] for face in BOX_FACES], dtype=np.float32)
+        normals = np.array([face[0] for face in BOX_FACES], dtype=np.float32)
+
+        positions = corners[:, QUAD_TO_TRIANGLES].reshape(-1, 3) * (np.array(size[:3], dtype=np.float32) / 2)
+        normals = np.repeat(normals, len(QUAD_TO_TRIANGLES), axis=0)
+
+        return np.ascontiguousarray(np.hstack((positions, normals)), dtype=np.float32)
+
+    def build_cylinder_vertices(self, radius, height, slices=16):
+        angles = np.linspace(0.0, 2.0 * np.pi, slices + 1)
+        c0, s0 = np.cos(angles[:-1]), np.sin(angles[:-1])
+        c1, s1 = np.cos(angles[1:]), np.sin(angles[1:])
+        x0, y0, x1, y1 = radius * c0, radius * s0, radius * c1, radius * s1
+
+        zero = np.zeros(slices)
+        one = np.ones(slices)
+        top = np.full(slices, height / 2)
+        bottom = -top
+
+        b0 = np.stack((x0, y0, bottom, c0, s0, zero), axis=1)
+        b1 = np.stack((x1, y1, bottom, c1, s1, zero), axis=1)
+        t0 = np.stack((x0, y0, top, c0, s0, zero), axis=1)
+        t1 = np.stack((x1, y1, top, c1, s1, zero), axis=1)
+
+        top_center = np.stack((zero, zero, top, zero, zero, one), axis=1)
+        top_0 = np.stack((x0, y0, top, zero, zero, one), axis=1)
+        top_1 = np.stack((x1, y1, top, zero, zero, one), axis=1)
+
+        bottom_center = np.stack((zero, zero, bottom, zero, zero, -one), axis=1)
+        bottom_0 = np.stack((x0, y0, bottom, zero, zero, -one), axis=1)
+        bottom_1 = np.stack((x1, y1, bottom, zero, zero, -one), axis=1)
+
+        vertices = np.stack((
+            b0, b1, t1, b0, t1, t0,
+            top_center, top_0, top_1,
+            bottom_center, bottom_0, bottom_1
+        ), axis=1)
+
+        return np.ascontiguousarray(vertices.reshape(-1, 6), dtype=np.float32)
+
+    def build_sphere_vertices(self, radius, slices=16, stacks=16):
+        lat = np.linspace(-0.5 * np.pi, 0.5 * np.pi, stacks + 1)
+        lng = np.linspace(0.0, 2.0 * np.pi, slices + 1)
+        lat_grid, lng_grid = np.meshgrid(lat, lng, indexing='ij')
+
+        normals = np.stack((
+            np.cos(lat_grid) * np.cos(lng_grid),
+            np.cos(lat_grid) * np.sin(lng_grid),
+            np.sin(lat_grid)
+        ), axis=-1)
+        grid = np.concatenate((normals * radius, normals), axis=-1)
+
+        v00, v10 = grid[:-1, :-1], grid[1:, :-1]
+        v01, v11 = grid[:-1, 1:], grid[1:, 1:]
+        vertices = np.stack((v00, v10, v11, v00, v11, v01), axis=2)
+
+        return np.ascontiguousarray(vertices.reshape(-1, 6), dtype=np.float32)
+
+    def build_mesh_vertices(self, key):
+        if key[0] == 'cylinder':
+            return self.build_cylinder_vertices(key[1], key[2])
+        elif key[0] == 'sphere':
+            return self.build_sphere_vertices(key[1])
+        return self.build_box_vertices(key[1:4])
+
+    def get_mesh_vertices(self, key):
+        vertices = self._vertex_cache.get(key)
+        if vertices is None:
+            vertices = self.build_mesh_vertices(key)
+            self._vertex_cache[key] = vertices
+        return vertices
+
+    def build_scene(self):
+        if not self.links:
+            return
 
-            glVertex3f(i, 0.0, -size)
-            glVertex3f(i, 0.0, size)
+        chunks = []
+        first = []
+        count = []
+        offset = 0
 
-        glEnd()
-        glEnable(GL_LIGHTING)
+        for link in self.links:
+            vertices = self.get_mesh_vertices(link['geometry_key'])
+            matrix = link['matrix']
+            color = self.colors.get(link['type'], self.colors['default'])
+
+            chunk = np.empty((len(vertices), 10), dtype=np.float32)
+            chunk[:, 0:3] = vertices[:, 0:3] @ matrix[:3, :3] + matrix[3, :3]
+            chunk[:, 3:6] = vertices[:, 3:6] @ matrix[:3, :3]
+            chunk[:, 6:10] = color
+
+            chunks.append(chunk)
+            first.append(offset)
+            count.append(len(vertices))
+            offset += len(vertices)
+
+        self._scene = (
+            np.ascontiguousarray(np.concatenate(chunks)),
+            np.array(first, dtype=np.int32),
+            np.array(count, dtype=np.int32)
+        )
 
-    def draw_box(self, size):
-        sx, sy, sz = size[0]/2, size[1]/2, size[2]/2
-
-        glBegin(GL_QUADS)
-
-        glNormal3f(0.0, 0.0, 1.0)
-        glVertex3f(-sx, -sy, sz)
-        glVertex3f(sx, -sy, sz)
-        glVertex3f(sx, sy, sz)
-        glVertex3f(-sx, sy, sz)
-
-        glNormal3f(0.0, 0.0, -1.0)
-        glVertex3f(-sx, -sy, -sz)
-        glVertex3f(-sx, sy, -sz)
-        glVertex3f(sx, sy, -sz)
-        glVertex3f(sx, -sy, -sz)
-
-        glNormal3f(0.0, 1.0, 0.0)
-        glVertex3f(-sx, sy, -sz)
-        glVertex3f(-sx, sy, sz)
-        glVertex3f(sx, sy, sz)
-        glVertex3f(sx, sy, -sz)
-
-        glNormal3f(0.0, -1.0, 0.0)
-        glVertex3f(-sx, -sy, -sz)
-        glVertex3f(sx, -sy, -sz)
-        glVertex3f(sx, -sy, sz)
-        glVertex3f(-sx, -sy, sz)
-
-        glNormal3f(1.0, 0.0, 0.0)
-        glVertex3f(sx, -sy, -sz)
-        glVertex3f(sx, sy, -sz)
-        glVertex3f(sx, sy, sz)
-        glVertex3f(sx, -sy, sz)
-
-        glNormal3f(-1.0, 0.0, 0.0)
-        glVertex3f(-sx, -sy, -sz)
-        glVertex3f(-sx, -sy, sz)
-        glVertex3f(-sx, sy, sz)
-        glVertex3f(-sx, sy, -sz)
-
-        glEnd()
-
-    def draw_cylinder(self, radius, height, slices=16):
-        import math
+    def draw_scene(self):
+        vertices, first, count = self._scene
 
-        glPushMatrix()
-        glTranslatef(0.0, 0.0, -height/2)
-
-        glBegin(GL_QUAD_STRIP)
-        for i in range(slices + 1):
-            angle = 2.0 * math.pi * i / slices
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            nx = math.cos(angle)
-            ny = math.sin(angle)
-
-            glNormal3f(nx, ny, 0.0)
-            glVertex3f(x, y, 0.0)
-            glVertex3f(x, y, height)
-        glEnd()
-
-        glBegin(GL_TRIANGLE_FAN)
-        glNormal3f(0.0, 0.0, 1.0)
-        glVertex3f(0.0, 0.0, height)
-        for i in range(slices + 1):
-            angle = 2.0 * math.pi * i / slices
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            glVertex3f(x, y, height)
-        glEnd()
-
-        glBegin(GL_TRIANGLE_FAN)
-        glNormal3f(0.0, 0.0, -1.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        for i in range(slices + 1):
-            angle = 2.0 * math.pi * i / slices
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            glVertex3f(x, y, 0.0)
-        glEnd()
+        if self._scene_vbo is None and bool(glGenBuffers):
+            self._scene_vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self._scene_vbo)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
 
-        glPopMatrix()
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
 
-    def draw_sphere(self, radius, slices=16, stacks=16):
-        import math
+        if self._scene_vbo is not None:
+            glBindBuffer(GL_ARRAY_BUFFER, self._scene_vbo)
+            glVertexPointer(3, GL_FLOAT, SCENE_STRIDE, ctypes.c_void_p(0))
+            glNormalPointer(GL_FLOAT, SCENE_STRIDE, ctypes.c_void_p(12))
+            glColorPointer(4, GL_FLOAT, SCENE_STRIDE, ctypes.c_void_p(24))
+        else:
+            glVertexPointer(3, GL_FLOAT, SCENE_STRIDE, array_pointer(vertices))
+            glNormalPointer(GL_FLOAT, SCENE_STRIDE, array_pointer(vertices, 12))
+            glColorPointer(4, GL_FLOAT, SCENE_STRIDE, array_pointer(vertices, 24))
+
+        glMultiDrawArrays(GL_TRIANGLES, first, count, len(count))
+
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def upload_mesh(self, vertices):
+        count = len(vertices)
+
+        if bool(glGenBuffers):
+            vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            return ('vbo', vbo, count)
+
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, array_pointer(vertices))
+        glNormalPointer(GL_FLOAT, VERTEX_STRIDE, array_pointer(vertices, 12))
+        glDrawArrays(GL_TRIANGLES, 0, count)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glEndList()
+        return ('list', list_id, count)
+
+    def draw_mesh(self, key):
+        mesh = self._mesh_cache.get(key)
+        if mesh is None:
+            mesh = self.upload_mesh(self.get_mesh_vertices(key))
+            self._mesh_cache[key] = mesh
+
+        kind, handle, count = mesh
+        if kind == 'list':
+            glCallList(handle)
+            return
 
-        for i in range(stacks):
-            lat0 = math.pi * (-0.5 + float(i) / stacks)
-            z0 = math.sin(lat0)
-            zr0 = math.cos(lat0)
+        glBindBuffer(GL_ARRAY_BUFFER, handle)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(12))
+        glDrawArrays(GL_TRIANGLES, 0, count)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
 
-            lat1 = math.pi * (-0.5 + float(i + 1) / stacks)
-            z1 = math.sin(lat1)
-            zr1 = math.cos(lat1)
+    def draw_box(self, size):
+        self.draw_mesh(self.get_geometry_key({'type': 'box', 'size': size}))
 
-            glBegin(GL_QUAD_STRIP)
-            for j in range(slices + 1):
-                lng = 2 * math.pi * float(j) / slices
-                x = math.cos(lng)
-                y = math.sin(lng)
+    def draw_cylinder(self, radius, height):
+        self.draw_mesh(self.get_geometry_key({'type': 'cylinder', 'radius': radius, 'length': height}))
 
-                glNormal3f(x * zr0, y * zr0, z0)
-                glVertex3f(x * zr0 * radius, y * zr0 * radius, z0 * radius)
-                glNormal3f(x * zr1, y * zr1, z1)
-                glVertex3f(x * zr1 * radius, y * zr1 * radius, z1 * radius)
-            glEnd()
+    def draw_sphere(self, radius):
+        self.draw_mesh(self.get_geometry_key({'type': 'sphere', 'radius': radius}))
 
     def draw_link(self, link):
         glPushMatrix()
 
-        origin = link.get('origin', {'xyz': [0, 0, 0], 'rpy': [0, 0, 0]})
-        x, y, z = origin['xyz']
-        roll, pitch, yaw = origin['rpy']
-
-        glTranslatef(x, y, z)
-        glRotatef(yaw * 180.0 / 3.14159, 0, 0, 1)
-        glRotatef(pitch * 180.0 / 3.14159, 0, 1, 0)
-        glRotatef(roll * 180.0 / 3.14159, 1, 0, 0)
+        glMultMatrixf(link['matrix'])
 
-        link_type = link.get('type', 'default')
-        color = self.colors.get(link_type, self.colors['default'])
-        glColor4f(*color)
+        glColor4fv(link['color'])
 
-        geometry = link.get('geometry', {'type': 'box', 'size': [0.1, 0.1, 0.1]})
-
-        if geometry['type'] == 'box':
-            self.draw_box(geometry['size'])
-        elif geometry['type'] == 'cylinder':
-            self.draw_cylinder(geometry['radius'], geometry['length'])
-        elif geometry['type'] == 'sphere':
-            self.draw_sphere(geometry['radius'])
-        else:
-            self.draw_box([0.1, 0.1, 0.1])
+        self.draw_mesh(link['geometry_key'])
 
         glPopMatrix()
 
@@ -343,8 +525,11 @@ class URDF3DViewer:
         self.draw_grid()
         self.draw_axis()
 
-        for link in self.links:
-            self.draw_link(link)
+        if self._scene is not None and bool(glMultiDrawArrays):
+            self.draw_scene()
+        else:
+            for link in self.links:
+                self.draw_link(link)
 
         glutSwapBuffers()
 
@@ -404,9 +589,6 @@ class URDF3DViewer:
 
             glutPostRedisplay()
 
-    def idle(self):
-        glutPostRedisplay()
-
     def run(self):
         if not OPENGL_AVAILABLE:
             print("ОШИБКА: PyOpenGL не установлен. Установите: pip install PyOpenGL PyOpenGL-accelerate")
@@ -416,6 +598,9 @@ class URDF3DViewer:
             print("ОШИБКА: NumPy не установлен. Установите: pip install numpy")
             return False
 
+        if not OPENGL_ACCELERATE_AVAILABLE:
+            print("ВНИМАНИЕ: PyOpenGL-accelerate не установлен, отрисовка будет медленнее. Установите: pip install PyOpenGL-accelerate")
+
         glutInit(sys.argv)
         glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
         glutInitWindowSize(800, 600)
@@ -430,7 +615,6 @@ class URDF3DViewer:
         glutKeyboardFunc(self.keyboard)
         glutMouseFunc(self.mouse)
         glutMotionFunc(self.motion)
-        glutIdleFunc(self.idle)
 
         self.running = True
 
@@ -449,13 +633,20 @@ class URDF3DViewer:
 
         return True
 
-def visualize_urdf_3d(urdf_content, title="URDF 3D Viewer"):
+def run_viewer(urdf_content, title):
     viewer = URDF3DViewer(urdf_content, title)
+    viewer.run()
+
+def visualize_urdf_3d(urdf_content, title="URDF 3D Viewer"):
+    if 'forkserver' in mp.get_all_start_methods():
+        ctx = mp.get_context('forkserver')
+    else:
+        ctx = mp.get_context('spawn')
 
-    thread = threading.Thread(target=viewer.run, daemon=True)
-    thread.start()
+    process = ctx.Process(target=run_viewer, args=(urdf_content, title), daemon=True)
+    process.start()
 
-    return viewer
+    return process
 
 if __name__ == "__main__":
     test_urdf = """
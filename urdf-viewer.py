@@ -2,12 +2,14 @@ import os
 import re
 import math
 import difflib
-import tempfile
+import html
+import importlib.util
+import itertools
 import subprocess
-import threading
+import xml.etree.ElementTree as ET
 from datetime import datetime
 from urllib.parse import urlparse
-from collections import Counter
+from collections import Counter, defaultdict, deque
 from io import BytesIO
 
 try:
@@ -17,16 +19,22 @@ except ImportError:
     print("ОШИБКА: Streamlit не установлен")
     exit(1)
 
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+def has_module(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
 LIBRARIES = {}
 
-try:
-    import git
-    LIBRARIES['git'] = True
-except ImportError:
-    LIBRARIES['git'] = False
+LIBRARIES['git'] = has_module('git')
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
     LIBRARIES['requests'] = True
 except ImportError:
     LIBRARIES['requests'] = False
@@ -34,45 +42,72 @@ except ImportError:
 try:
     import plotly.graph_objects as go
     import plotly.express as px
+    ELEMENT_PALETTE = tuple(px.colors.qualitative.Set3)
+    AUTHOR_PALETTE = tuple(px.colors.qualitative.Plotly)
     LIBRARIES['plotly'] = True
 except ImportError:
     LIBRARIES['plotly'] = False
 
-try:
-    import numpy as np
-    LIBRARIES['numpy'] = True
-except ImportError:
-    LIBRARIES['numpy'] = False
-
-try:
-    import networkx as nx
-    LIBRARIES['networkx'] = True
-except ImportError:
-    LIBRARIES['networkx'] = False
-
-try:
-    import matplotlib
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    from matplotlib.patches import Circle, Rectangle, FancyBboxPatch
-    from matplotlib.collections import PatchCollection
-    LIBRARIES['matplotlib'] = True
-except ImportError:
-    LIBRARIES['matplotlib'] = False
-
-try:
-    import OpenGL
-    OpenGL.ERROR_CHECKING = False
-    LIBRARIES['opengl'] = True
-except ImportError:
-    LIBRARIES['opengl'] = False
-
-def create_3d_viewer_script(urdf_content, title):
-    script = f'''
+LIBRARIES['numpy'] = has_module('numpy')
+LIBRARIES['networkx'] = has_module('networkx')
+LIBRARIES['matplotlib'] = has_module('matplotlib')
+LIBRARIES['opengl'] = has_module('OpenGL')
+
+LIBRARY_STATUS_MD = "  \n".join(
+    f"{'✅' if is_available else '❌'} {lib_name}" for lib_name, is_available in LIBRARIES.items()
+)
+
+_LINK_NAME_RE = re.compile(r'<link\s+name="([^"]+)"')
+_JOINT_LINKS_RE = re.compile(r'<joint\s+name="([^"]+)".*?<parent\s+link="([^"]+)".*?<child\s+link="([^"]+)"', re.DOTALL)
+
+_SIZE_RE = re.compile(r'size="([\d\.\s]+)"')
+_MASS_RE = re.compile(r'mass\s*value\s*=\s*"([\d\.]+)"')
+
+JOINT_TYPES = ('revolute', 'prismatic', 'fixed', 'continuous')
+GEOMETRY_TYPES = ('box', 'cylinder', 'sphere', 'mesh')
+
+_URDF_TOKEN_RE = re.compile(
+    r'<(?:(link|joint)\s|(visual|collision)>|(box|cylinder|sphere|mesh)\b)'
+    r'|type="(revolute|prismatic|fixed|continuous)"',
+    re.IGNORECASE
+)
+
+CHANGE_KINDS = (
+    ('<link', 'link'),
+    ('<joint', 'joint'),
+    ('<visual', 'visual'),
+    ('<collision', 'collision'),
+    ('<origin', 'origin'),
+    ('<geometry', 'geometry'),
+    ('<material', 'material'),
+    ('name="', 'name'),
+    ('xyz="', 'pose'),
+    ('rpy="', 'pose'),
+)
+
+_NODE_TYPE_RE = re.compile(
+    r'(?=.*(?:base|root)(?P<base>))'
+    r'|(?=.*wheel(?P<wheel>))'
+    r'|(?=.*(?:camera|sensor)(?P<sensor>))'
+    r'|(?=.*(?:gripper|hand)(?P<gripper>))'
+    r'|(?=.*link(?P<link>))',
+    re.DOTALL
+)
+_NODE_COLORS = {
+    'base': '#3498db',
+    'wheel': '#e74c3c',
+    'sensor': '#9b59b6',
+    'gripper': '#1abc9c',
+    'link': '#2ecc71'
+}
+
+VIEWER_SCRIPT = '''
 import sys
 import os
 import re
 import math
+import ctypes
+import xml.etree.ElementTree as ET
 import threading
 
 try:
@@ -83,10 +118,41 @@ try:
     from OpenGL.GLUT import *
     import numpy as np
 except ImportError as e:
-    print(f"ОШИБКА: Не удалось импортировать OpenGL: {{e}}")
+    print(f"ОШИБКА: Не удалось импортировать OpenGL: {e}")
     print("Установите: pip install PyOpenGL PyOpenGL-accelerate numpy")
     sys.exit(1)
 
+VERTEX_STRIDE = 24
+
+BOX_FACES = (
+    ((0.0, 0.0, 1.0), ((-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1))),
+    ((0.0, 0.0, -1.0), ((-1, -1, -1), (-1, 1, -1), (1, 1, -1), (1, -1, -1))),
+    ((0.0, 1.0, 0.0), ((-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1))),
+    ((0.0, -1.0, 0.0), ((-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1))),
+    ((1.0, 0.0, 0.0), ((1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1))),
+    ((-1.0, 0.0, 0.0), ((-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1))),
+)
+
+QUAD_TO_TRIANGLES = [0, 1, 2, 0, 2, 3]
+QUAD_OUTLINE = ((0, 1), (1, 2), (4, 5), (5, 0))
+CYLINDER_OUTLINE = QUAD_OUTLINE + ((6, 7), (7, 8), (8, 6), (9, 10), (10, 11), (11, 9))
+
+MESH_OUTLINES = {
+    'box': (len(QUAD_TO_TRIANGLES), QUAD_OUTLINE),
+    'cylinder': (12, CYLINDER_OUTLINE),
+    'sphere': (len(QUAD_TO_TRIANGLES), QUAD_OUTLINE)
+}
+
+LINK_TYPE_RE = re.compile(
+    r'(?=.*(?:base|root|chassis)(?P<base>))'
+    r'|(?=.*(?:wheel|caster)(?P<wheel>))'
+    r'|(?=.*(?:camera|sensor|lidar)(?P<sensor>))'
+    r'|(?=.*(?:gripper|hand|finger)(?P<gripper>))'
+    r'|(?=.*joint(?P<joint>))'
+    r'|(?=.*link(?P<link>))',
+    re.DOTALL
+)
+
 class URDF3DViewer:
     def __init__(self, urdf_content, title="URDF 3D Viewer"):
         self.urdf_content = urdf_content
@@ -105,7 +171,17 @@ class URDF3DViewer:
         self.joints = []
         self.parse_urdf()
 
-        self.colors = {{
+        self._vertices = {
+            'box': self.build_box_vertices(),
+            'cylinder': self.build_cylinder_vertices(),
+            'sphere': self.build_sphere_vertices()
+        }
+        self._meshes = {}
+        self._grid = self.build_grid_vertices(size=5, step=1)
+        self._grid_vbo = None
+        self._joint_segments = self.build_joint_segments()
+
+        self.colors = {
             'base': (0.2, 0.4, 0.8, 1.0),
             'link': (0.4, 0.8, 0.2, 1.0),
             'joint': (0.8, 0.2, 0.2, 1.0),
@@ -113,113 +189,127 @@ class URDF3DViewer:
             'sensor': (0.8, 0.2, 0.8, 1.0),
             'gripper': (0.2, 0.8, 0.8, 1.0),
             'default': (0.7, 0.7, 0.7, 1.0)
-        }}
+        }
 
     def parse_urdf(self):
         if not self.urdf_content:
             return
 
-        link_pattern = r'<link\\s+name="([^"]+)"(.*?)</link>'
-        for match in re.finditer(link_pattern, self.urdf_content, re.DOTALL):
-            link_name = match.group(1)
-            link_content = match.group(2)
-
-            visual_pattern = r'<visual>(.*?)</visual>'
-            visual_match = re.search(visual_pattern, link_content, re.DOTALL | re.IGNORECASE)
+        try:
+            root = ET.fromstring(self.urdf_content)
+        except ET.ParseError as e:
+            print(f"Ошибка разбора URDF: {e}")
+            return
 
-            geometry = {{'type': 'box', 'size': [0.1, 0.1, 0.1]}}
-            origin = {{'xyz': [0.0, 0.0, 0.0], 'rpy': [0.0, 0.0, 0.0]}}
+        for link in root.iter('link'):
+            link_name = link.get('name')
+            if not link_name:
+                continue
 
-            if visual_match:
-                visual_content = visual_match.group(1)
+            geometry = {'type': 'box', 'size': [0.1, 0.1, 0.1]}
+            origin = {'xyz': [0.0, 0.0, 0.0], 'rpy': [0.0, 0.0, 0.0]}
 
-                visual_origin = self.parse_origin(visual_content)
+            visual = link.find('visual')
+            if visual is not None:
+                geometry, visual_origin = self.parse_visual(visual)
                 if visual_origin['xyz'] != [0.0, 0.0, 0.0]:
                     origin = visual_origin
 
-                visual_geometry = self.parse_geometry(visual_content)
-                if visual_geometry['type'] != 'box' or visual_geometry['size'] != [0.1, 0.1, 0.1]:
-                    geometry = visual_geometry
-
-            self.links.append({{
+            self.links.append({
                 'name': link_name,
                 'geometry': geometry,
                 'origin': origin,
+                'rotation': [math.degrees(angle) for angle in origin['rpy']],
                 'type': self.get_link_type(link_name)
-            }})
+            })
 
-        joint_pattern = r'<joint\\s+name="([^"]+)"(.*?)</joint>'
-        for match in re.finditer(joint_pattern, self.urdf_content, re.DOTALL):
-            joint_content = match.group(2)
+        for joint in root.iter('joint'):
+            parent = joint.find('parent')
+            child = joint.find('child')
 
-            parent_match = re.search(r'<parent\\s+link="([^"]+)"', joint_content)
-            child_match = re.search(r'<child\\s+link="([^"]+)"', joint_content)
+            if parent is not None and child is not None and parent.get('link') and child.get('link'):
+                self.joints.append({
+                    'name': joint.get('name'),
+                    'parent': parent.get('link'),
+                    'child': child.get('link'),
+                    'origin': self.parse_origin(joint)
+                })
 
-            if parent_match and child_match:
-                origin = self.parse_origin(joint_content)
+    def parse_vector(self, value):
+        try:
+            values = list(map(float, value.split()))
+        except (AttributeError, ValueError):
+            return None
+        return values[:3] if len(values) >= 3 else None
 
-                self.joints.append({{
-                    'name': match.group(1),
-                    'parent': parent_match.group(1),
-                    'child': child_match.group(1),
-                    'origin': origin
-                }})
+    def parse_visual(self, visual):
+        geometry = None
+        origin = None
 
-    def parse_geometry(self, content):
-        box_match = re.search(r'<box\\s+size="([\\d\\.\\s]+)"', content, re.IGNORECASE)
-        if box_match:
-            sizes = list(map(float, box_match.group(1).split()))
-            if len(sizes) >= 3:
-                return {{'type': 'box', 'size': sizes[:3]}}
-
-        cylinder_match = re.search(r'<cylinder\\s+radius="([\\d\\.]+)"\\s+length="([\\d\\.]+)"', content, re.IGNORECASE)
-        if cylinder_match:
-            return {{
-                'type': 'cylinder',
-                'radius': float(cylinder_match.group(1)),
-                'length': float(cylinder_match.group(2))
-            }}
-
-        sphere_match = re.search(r'<sphere\\s+radius="([\\d\\.]+)"', content, re.IGNORECASE)
-        if sphere_match:
-            return {{'type': 'sphere', 'radius': float(sphere_match.group(1))}}
-
-        return {{'type': 'box', 'size': [0.1, 0.1, 0.1]}}
-
-    def parse_origin(self, content):
-        origin_match = re.search(r'<origin\\s+xyz="([-\\d\\.\\s]+)"(?:\\s+rpy="([-\\d\\.\\s]+)")?', content, re.IGNORECASE)
-        if origin_match:
-            xyz = list(map(float, origin_match.group(1).split()))
-            if len(xyz) < 3:
-                xyz = [0.0, 0.0, 0.0]
-
-            if origin_match.group(2):
-                rpy = list(map(float, origin_match.group(2).split()))
-                if len(rpy) < 3:
-                    rpy = [0.0, 0.0, 0.0]
-            else:
-                rpy = [0.0, 0.0, 0.0]
+        for child in visual:
+            if child.tag == 'origin':
+                origin = self.read_origin(child)
+            elif child.tag == 'geometry':
+                for shape in child:
+                    geometry = self.read_shape(shape)
+                    if geometry:
+                        break
+
+        if geometry is None:
+            geometry = {'type': 'box', 'size': [0.1, 0.1, 0.1]}
+        if origin is None:
+            origin = {'xyz': [0.0, 0.0, 0.0], 'rpy': [0.0, 0.0, 0.0]}
+
+        return geometry, origin
+
+    def read_shape(self, shape):
+        try:
+            if shape.tag == 'box':
+                size = self.parse_vector(shape.get('size'))
+                return {'type': 'box', 'size': size} if size else None
+            elif shape.tag == 'cylinder':
+                return {
+                    'type': 'cylinder',
+                    'radius': float(shape.get('radius')),
+                    'length': float(shape.get('length'))
+                }
+            elif shape.tag == 'sphere':
+                return {'type': 'sphere', 'radius': float(shape.get('radius'))}
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def read_origin(self, origin):
+        return {
+            'xyz': self.parse_vector(origin.get('xyz')) or [0.0, 0.0, 0.0],
+            'rpy': self.parse_vector(origin.get('rpy')) or [0.0, 0.0, 0.0]
+        }
 
-            return {{'xyz': xyz[:3], 'rpy': rpy[:3]}}
+    def parse_origin(self, element):
+        origin = element.find('origin')
+        if origin is None:
+            return {'xyz': [0.0, 0.0, 0.0], 'rpy': [0.0, 0.0, 0.0]}
+        return self.read_origin(origin)
+
+    def build_joint_segments(self):
+        link_index = {}
+        for i, link in enumerate(self.links):
+            link_index.setdefault(link['name'], i)
+
+        edges = [
+            (link_index[joint['parent']], link_index[joint['child']])
+            for joint in self.joints
+            if joint['parent'] in link_index and joint['child'] in link_index
+        ]
+        if not edges:
+            return None
 
-        return {{'xyz': [0.0, 0.0, 0.0], 'rpy': [0.0, 0.0, 0.0]}}
+        positions = np.array([link['origin']['xyz'] for link in self.links], dtype=np.float32)[:, [0, 2, 1]]
+        return np.ascontiguousarray(positions[np.array(edges).ravel()])
 
     def get_link_type(self, link_name):
-        name_lower = link_name.lower()
-        if 'base' in name_lower or 'root' in name_lower or 'chassis' in name_lower:
-            return 'base'
-        elif 'wheel' in name_lower or 'caster' in name_lower:
-            return 'wheel'
-        elif 'camera' in name_lower or 'sensor' in name_lower or 'lidar' in name_lower:
-            return 'sensor'
-        elif 'gripper' in name_lower or 'hand' in name_lower or 'finger' in name_lower:
-            return 'gripper'
-        elif 'joint' in name_lower:
-            return 'joint'
-        elif 'link' in name_lower:
-            return 'link'
-        else:
-            return 'default'
+        match = LINK_TYPE_RE.match(link_name.lower())
+        return match.lastgroup if match else 'default'
 
     def init_gl(self):
         glClearColor(0.1, 0.1, 0.1, 1.0)
@@ -227,6 +317,9 @@ class URDF3DViewer:
         glEnable(GL_LIGHTING)
         glEnable(GL_LIGHT0)
         glEnable(GL_COLOR_MATERIAL)
+        glEnable(GL_NORMALIZE)
+        glEnable(GL_POLYGON_OFFSET_FILL)
+        glPolygonOffset(1.0, 1.0)
         glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
 
         light_position = [5.0, 5.0, 5.0, 1.0]
@@ -237,6 +330,10 @@ class URDF3DViewer:
         glMaterialfv(GL_FRONT, GL_AMBIENT, [0.1, 0.1, 0.1, 1.0])
         glMaterialfv(GL_FRONT, GL_DIFFUSE, [0.7, 0.7, 0.7, 1.0])
 
+        self.upload_meshes()
+        self.upload_grid()
+        self.compile_display_lists()
+
     def draw_axis(self):
         glDisable(GL_LIGHTING)
         glLineWidth(2.0)
@@ -257,171 +354,210 @@ class URDF3DViewer:
         glEnd()
         glEnable(GL_LIGHTING)
 
-    def draw_grid(self, size=10, step=1):
+    def build_grid_vertices(self, size=10, step=1):
+        ticks = np.arange(-size, size + 1, step, dtype=np.float32)
+        zero = np.zeros_like(ticks)
+        edge = np.full_like(ticks, size)
+
+        vertices = np.stack((
+            np.stack((-edge, zero, ticks), axis=1),
+            np.stack((edge, zero, ticks), axis=1),
+            np.stack((ticks, zero, -edge), axis=1),
+            np.stack((ticks, zero, edge), axis=1)
+        ), axis=1)
+
+        return np.ascontiguousarray(vertices.reshape(-1, 3), dtype=np.float32)
+
+    def upload_grid(self):
+        self._grid_vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self._grid_vbo)
+        glBufferData(GL_ARRAY_BUFFER, self._grid.nbytes, self._grid, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw_grid(self):
         glDisable(GL_LIGHTING)
         glColor3f(0.3, 0.3, 0.3)
         glLineWidth(0.5)
-        glBegin(GL_LINES)
 
-        for i in range(-size, size + 1, step):
-            glVertex3f(-size, 0.0, i)
-            glVertex3f(size, 0.0, i)
+        glBindBuffer(GL_ARRAY_BUFFER, self._grid_vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, ctypes.c_void_p(0))
+        glDrawArrays(GL_LINES, 0, len(self._grid))
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
 
-            glVertex3f(i, 0.0, -size)
-            glVertex3f(i, 0.0, size)
-
-        glEnd()
         glEnable(GL_LIGHTING)
 
-    def draw_box(self, size):
-        sx, sy, sz = size[0]/2, size[1]/2, size[2]/2
-
-        glBegin(GL_QUADS)
-
-        glNormal3f(0.0, 0.0, 1.0)
-        glVertex3f(-sx, -sy, sz)
-        glVertex3f(sx, -sy, sz)
-        glVertex3f(sx, sy, sz)
-        glVertex3f(-sx, sy, sz)
-
-        glNormal3f(0.0, 0.0, -1.0)
-        glVertex3f(-sx, -sy, -sz)
-        glVertex3f(-sx, sy, -sz)
-        glVertex3f(sx, sy, -sz)
-        glVertex3f(sx, -sy, -sz)
-
-        glNormal3f(0.0, 1.0, 0.0)
-        glVertex3f(-sx, sy, -sz)
-        glVertex3f(-sx, sy, sz)
-        glVertex3f(sx, sy, sz)
-        glVertex3f(sx, sy, -sz)
-
-        glNormal3f(0.0, -1.0, 0.0)
-        glVertex3f(-sx, -sy, -sz)
-        glVertex3f(sx, -sy, -sz)
-        glVertex3f(sx, -sy, sz)
-        glVertex3f(-sx, -sy, sz)
-
-        glNormal3f(1.0, 0.0, 0.0)
-        glVertex3f(sx, -sy, -sz)
-        glVertex3f(sx, sy, -sz)
-        glVertex3f(sx, sy, sz)
-        glVertex3f(sx, -sy, sz)
-
-        glNormal3f(-1.0, 0.0, 0.0)
-        glVertex3f(-sx, -sy, -sz)
-        glVertex3f(-sx, -sy, sz)
-        glVertex3f(-sx, sy, sz)
-        glVertex3f(-sx, sy, -sz)
+    def build_box_vertices(self):
+        corners = np.array([face[1] for face in BOX_FACES], dtype=np.float32)
+        normals = np.array([face[0] for face in BOX_FACES], dtype=np.float32)
 
-        glEnd()
+        positions = corners[:, QUAD_TO_TRIANGLES].reshape(-1, 3) * 0.5
+        normals = np.repeat(normals, len(QUAD_TO_TRIANGLES), axis=0)
+
+        return np.ascontiguousarray(np.hstack((positions, normals)), dtype=np.float32)
+
+    def build_cylinder_vertices(self, slices=16):
+        angles = np.linspace(0.0, 2.0 * np.pi, slices + 1)
+        c0, s0 = np.cos(angles[:-1]), np.sin(angles[:-1])
+        c1, s1 = np.cos(angles[1:]), np.sin(angles[1:])
+
+        zero = np.zeros(slices)
+        one = np.ones(slices)
+        top = np.full(slices, 0.5)
+        bottom = -top
+
+        b0 = np.stack((c0, s0, bottom, c0, s0, zero), axis=1)
+        b1 = np.stack((c1, s1, bottom, c1, s1, zero), axis=1)
+        t0 = np.stack((c0, s0, top, c0, s0, zero), axis=1)
+        t1 = np.stack((c1, s1, top, c1, s1, zero), axis=1)
+
+        top_center = np.stack((zero, zero, top, zero, zero, one), axis=1)
+        top_0 = np.stack((c0, s0, top, zero, zero, one), axis=1)
+        top_1 = np.stack((c1, s1, top, zero, zero, one), axis=1)
+
+        bottom_center = np.stack((zero, zero, bottom, zero, zero, -one), axis=1)
+        bottom_0 = np.stack((c0, s0, bottom, zero, zero, -one), axis=1)
+        bottom_1 = np.stack((c1, s1, bottom, zero, zero, -one), axis=1)
+
+        vertices = np.stack((
+            b0, b1, t1, b0, t1, t0,
+            top_center, top_0, top_1,
+            bottom_center, bottom_0, bottom_1
+        ), axis=1)
+
+        return np.ascontiguousarray(vertices.reshape(-1, 6), dtype=np.float32)
+
+    def build_sphere_vertices(self, slices=16, stacks=16):
+        lat = np.linspace(-0.5 * np.pi, 0.5 * np.pi, stacks + 1)
+        lng = np.linspace(0.0, 2.0 * np.pi, slices + 1)
+        lat_grid, lng_grid = np.meshgrid(lat, lng, indexing='ij')
+
+        normals = np.stack((
+            np.cos(lat_grid) * np.cos(lng_grid),
+            np.cos(lat_grid) * np.sin(lng_grid),
+            np.sin(lat_grid)
+        ), axis=-1)
+        grid = np.concatenate((normals, normals), axis=-1)
+
+        v00, v10 = grid[:-1, :-1], grid[1:, :-1]
+        v01, v11 = grid[:-1, 1:], grid[1:, 1:]
+        vertices = np.stack((v00, v10, v11, v00, v11, v01), axis=2)
+
+        return np.ascontiguousarray(vertices.reshape(-1, 6), dtype=np.float32)
+
+    def build_line_indices(self, vertices, group_size, outline):
+        positions = np.round(vertices[:, :3], 5)
+        _, first, inverse = np.unique(positions, axis=0, return_index=True, return_inverse=True)
+        groups = first[inverse.ravel()].reshape(-1, group_size)
+
+        edges = groups[:, np.array(outline)].reshape(-1, 2)
+        edges = np.unique(np.sort(edges, axis=1), axis=0)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+
+        return np.ascontiguousarray(edges.ravel(), dtype=np.uint32)
+
+    def upload_meshes(self):
+        for name, vertices in self._vertices.items():
+            vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, vbo)
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+
+            lines = self.build_line_indices(vertices, *MESH_OUTLINES[name])
+            ibo = glGenBuffers(1)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, lines.nbytes, lines, GL_STATIC_DRAW)
+
+            self._meshes[name] = (vbo, len(vertices), ibo, len(lines))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw_mesh(self, name, sx, sy, sz):
+        vbo, count, ibo, line_count = self._meshes[name]
 
-    def draw_cylinder(self, radius, height, slices=16):
         glPushMatrix()
-        glTranslatef(0.0, 0.0, -height/2)
-
-        glBegin(GL_QUAD_STRIP)
-        for i in range(slices + 1):
-            angle = 2.0 * math.pi * i / slices
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            nx = math.cos(angle)
-            ny = math.sin(angle)
-
-            glNormal3f(nx, ny, 0.0)
-            glVertex3f(x, y, 0.0)
-            glVertex3f(x, y, height)
-        glEnd()
+        glScalef(sx, sy, sz)
 
-        glBegin(GL_TRIANGLE_FAN)
-        glNormal3f(0.0, 0.0, 1.0)
-        glVertex3f(0.0, 0.0, height)
-        for i in range(slices + 1):
-            angle = 2.0 * math.pi * i / slices
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            glVertex3f(x, y, height)
-        glEnd()
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(12))
+        glDrawArrays(GL_TRIANGLES, 0, count)
+        glDisableClientState(GL_NORMAL_ARRAY)
 
-        glBegin(GL_TRIANGLE_FAN)
-        glNormal3f(0.0, 0.0, -1.0)
-        glVertex3f(0.0, 0.0, 0.0)
-        for i in range(slices + 1):
-            angle = 2.0 * math.pi * i / slices
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            glVertex3f(x, y, 0.0)
-        glEnd()
+        glDisable(GL_LIGHTING)
+        glColor3f(1.0, 1.0, 1.0)
+        glLineWidth(1.0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ibo)
+        glDrawElements(GL_LINES, line_count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glEnable(GL_LIGHTING)
+
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
 
         glPopMatrix()
 
-    def draw_sphere(self, radius, slices=16, stacks=16):
-        for i in range(stacks):
-            lat0 = math.pi * (-0.5 + float(i) / stacks)
-            z0 = math.sin(lat0)
-            zr0 = math.cos(lat0)
+    def get_geometry_key(self, geometry):
+        if geometry['type'] == 'box':
+            return ('box',) + tuple(geometry['size'][:3])
+        elif geometry['type'] == 'cylinder':
+            return ('cylinder', geometry['radius'], geometry['length'])
+        elif geometry['type'] == 'sphere':
+            return ('sphere', geometry['radius'])
+        return ('box', 0.1, 0.1, 0.1)
 
-            lat1 = math.pi * (-0.5 + float(i + 1) / stacks)
-            z1 = math.sin(lat1)
-            zr1 = math.cos(lat1)
+    def compile_display_lists(self):
+        display_lists = {}
 
-            glBegin(GL_QUAD_STRIP)
-            for j in range(slices + 1):
-                lng = 2 * math.pi * float(j) / slices
-                x = math.cos(lng)
-                y = math.sin(lng)
+        for link in self.links:
+            key = self.get_geometry_key(link['geometry'])
+
+            list_id = display_lists.get(key)
+            if list_id is None:
+                list_id = glGenLists(1)
+                glNewList(list_id, GL_COMPILE)
+                if key[0] == 'cylinder':
+                    self.draw_cylinder(key[1], key[2])
+                elif key[0] == 'sphere':
+                    self.draw_sphere(key[1])
+                else:
+                    self.draw_box(key[1:4])
+                glEndList()
+                display_lists[key] = list_id
 
-                glNormal3f(x * zr0, y * zr0, z0)
-                glVertex3f(x * zr0 * radius, y * zr0 * radius, z0 * radius)
-                glNormal3f(x * zr1, y * zr1, z1)
-                glVertex3f(x * zr1 * radius, y * zr1 * radius, z1 * radius)
-            glEnd()
+            link['display_list'] = list_id
+
+    def draw_box(self, size):
+        self.draw_mesh('box', size[0], size[1], size[2])
+
+    def draw_cylinder(self, radius, height):
+        self.draw_mesh('cylinder', radius, radius, height)
+
+    def draw_sphere(self, radius):
+        self.draw_mesh('sphere', radius, radius, radius)
 
     def draw_link(self, link):
         glPushMatrix()
 
-        origin = link.get('origin', {{'xyz': [0, 0, 0], 'rpy': [0, 0, 0]}})
-        x, y, z = origin['xyz']
-        roll, pitch, yaw = origin['rpy']
+        x, y, z = link['origin']['xyz']
+        roll, pitch, yaw = link['rotation']
 
         glTranslatef(x, y, z)
 
         if yaw != 0:
-            glRotatef(yaw * 180.0 / math.pi, 0, 0, 1)
+            glRotatef(yaw, 0, 0, 1)
         if pitch != 0:
-            glRotatef(pitch * 180.0 / math.pi, 0, 1, 0)
+            glRotatef(pitch, 0, 1, 0)
         if roll != 0:
-            glRotatef(roll * 180.0 / math.pi, 1, 0, 0)
+            glRotatef(roll, 1, 0, 0)
 
         link_type = link.get('type', 'default')
         color = self.colors.get(link_type, self.colors['default'])
         glColor4f(*color)
 
-        geometry = link.get('geometry', {{'type': 'box', 'size': [0.1, 0.1, 0.1]}})
-
-        if geometry['type'] == 'box':
-            self.draw_box(geometry['size'])
-        elif geometry['type'] == 'cylinder':
-            self.draw_cylinder(geometry['radius'], geometry['length'])
-        elif geometry['type'] == 'sphere':
-            self.draw_sphere(geometry['radius'])
-        else:
-            self.draw_box([0.1, 0.1, 0.1])
-
-        glDisable(GL_LIGHTING)
-        glColor3f(1.0, 1.0, 1.0)
-        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
-        glLineWidth(1.0)
-
-        if geometry['type'] == 'box':
-            self.draw_box(geometry['size'])
-        elif geometry['type'] == 'cylinder':
-            self.draw_cylinder(geometry['radius'], geometry['length'])
-        elif geometry['type'] == 'sphere':
-            self.draw_sphere(geometry['radius'])
-
-        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
-        glEnable(GL_LIGHTING)
+        glCallList(link['display_list'])
 
         glPopMatrix()
 
@@ -429,9 +565,13 @@ class URDF3DViewer:
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
 
-        cam_x = self.camera_distance * math.cos(math.radians(self.camera_angle_x)) * math.cos(math.radians(self.camera_angle_y))
-        cam_y = self.camera_distance * math.sin(math.radians(self.camera_angle_x)) * math.cos(math.radians(self.camera_angle_y))
-        cam_z = self.camera_distance * math.sin(math.radians(self.camera_angle_y))
+        angle_x = math.radians(self.camera_angle_x)
+        angle_y = math.radians(self.camera_angle_y)
+        horizontal = self.camera_distance * math.cos(angle_y)
+
+        cam_x = horizontal * math.cos(angle_x)
+        cam_y = horizontal * math.sin(angle_x)
+        cam_z = self.camera_distance * math.sin(angle_y)
 
         gluLookAt(
             cam_x, cam_z, cam_y,
@@ -439,30 +579,23 @@ class URDF3DViewer:
             0.0, 1.0, 0.0
         )
 
-        self.draw_grid(size=5, step=1)
+        self.draw_grid()
         self.draw_axis()
 
         for link in self.links:
             self.draw_link(link)
 
-        glDisable(GL_LIGHTING)
-        glColor3f(1.0, 0.5, 0.0)
-        glLineWidth(2.0)
-        glBegin(GL_LINES)
-
-        for joint in self.joints:
-            parent_link = next((link for link in self.links if link['name'] == joint['parent']), None)
-            child_link = next((link for link in self.links if link['name'] == joint['child']), None)
-
-            if parent_link and child_link:
-                parent_pos = parent_link['origin']['xyz']
-                child_pos = child_link['origin']['xyz']
+        if self._joint_segments is not None:
+            glDisable(GL_LIGHTING)
+            glColor3f(1.0, 0.5, 0.0)
+            glLineWidth(2.0)
 
-                glVertex3f(parent_pos[0], parent_pos[2], parent_pos[1])
-                glVertex3f(child_pos[0], child_pos[2], child_pos[1])
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 0, self._joint_segments)
+            glDrawArrays(GL_LINES, 0, len(self._joint_segments))
+            glDisableClientState(GL_VERTEX_ARRAY)
 
-        glEnd()
-        glEnable(GL_LIGHTING)
+            glEnable(GL_LIGHTING)
 
         glutSwapBuffers()
 
@@ -525,9 +658,6 @@ class URDF3DViewer:
 
             glutPostRedisplay()
 
-    def idle(self):
-        glutPostRedisplay()
-
     def run(self):
         glutInit(sys.argv)
         glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
@@ -543,13 +673,12 @@ class URDF3DViewer:
         glutKeyboardFunc(self.keyboard)
         glutMouseFunc(self.mouse)
         glutMotionFunc(self.motion)
-        glutIdleFunc(self.idle)
 
         self.running = True
 
         print(f"\\n=== URDF 3D Viewer ===")
-        print(f"Файл: {{self.title}}")
-        print(f"Компонентов: {{len(self.links)}} линков, {{len(self.joints)}} соединений")
+        print(f"Файл: {self.title}")
+        print(f"Компонентов: {len(self.links)} линков, {len(self.joints)} соединений")
         print("\\nУправление:")
         print("  ЛКМ + мышь: вращение камеры")
         print("  W/S: вращение по вертикали")
@@ -567,22 +696,20 @@ def main():
     import sys
     import json
 
-    if len(sys.argv) < 3:
-        print("Использование: python 3d_viewer.py <urdf_content_file> <title>")
+    if len(sys.argv) < 2:
+        print("Использование: python 3d_viewer.py <title> < model.urdf")
         return
 
-    urdf_file = sys.argv[1]
-    title = sys.argv[2]
+    title = sys.argv[1]
 
     try:
-        with open(urdf_file, 'r', encoding='utf-8') as f:
-            urdf_content = f.read()
+        urdf_content = sys.stdin.buffer.read().decode('utf-8')
 
         viewer = URDF3DViewer(urdf_content, title)
         viewer.run()
 
     except Exception as e:
-        print(f"Ошибка запуска 3D просмотрщика: {{e}}")
+        print(f"Ошибка запуска 3D просмотрщика: {e}")
         import traceback
         traceback.print_exc()
 
@@ -590,40 +717,14 @@ if __name__ == "__main__":
     main()
 '''
 
-    import tempfile
-    script_file = tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8')
-    script_file.write(script)
-    script_file.close()
-
-    urdf_file = tempfile.NamedTemporaryFile(mode='w', suffix='.urdf', delete=False, encoding='utf-8')
-    urdf_file.write(urdf_content)
-    urdf_file.close()
-
-    return script_file.name, urdf_file.name
-
 def visualize_urdf_3d_separate_process(urdf_content, title="URDF 3D Viewer"):
     try:
-        script_path, urdf_path = create_3d_viewer_script(urdf_content, title)
-
         import sys
         python_exec = sys.executable
 
-        process = subprocess.Popen(
-            [python_exec, script_path, urdf_path, title],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        def read_output():
-            for line in process.stdout:
-                print(line, end='')
-
-        output_thread = threading.Thread(target=read_output, daemon=True)
-        output_thread.start()
-
-        import time
-        time.sleep(1)
+        process = subprocess.Popen([python_exec, '-c', VIEWER_SCRIPT, title], stdin=subprocess.PIPE)
+        process.stdin.write(urdf_content.encode('utf-8'))
+        process.stdin.close()
 
         return process
 
@@ -641,38 +742,51 @@ def parse_github_url(url):
         pass
     return None, None
 
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    session = requests.Session()
+
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=10,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    )
+    session.mount('https://', adapter)
+
+    session.headers['Accept'] = 'application/vnd.github+json'
+    token = os.environ.get('GITHUB_TOKEN')
+    if token:
+        session.headers['Authorization'] = f'Bearer {token}'
+
+    return session
+
 def search_github_files(owner, repo):
     if not LIBRARIES.get('requests'):
         return []
 
-    files = []
-
     try:
         with st.spinner(f"Поиск файлов в {owner}/{repo}..."):
-            common_paths = ["", "urdf/", "urdf_tutorial/urdf/", "robots/", "urdf/models/", "description/urdf/"]
-
-            for path in common_paths:
-                try:
-                    api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
-                    response = requests.get(api_url, timeout=10)
-
-                    if response.status_code == 200:
-                        items = response.json()
-                        for item in items:
-                            if isinstance(item, dict) and item.get('type') == 'file':
-                                filename = item.get('name', '').lower()
-                                if filename.endswith(('.urdf', '.xacro')):
-                                    files.append({
-                                        'path': item['path'],
-                                        'name': item['name'],
-                                        'url': item.get('html_url', '')
-                                    })
-
-                except:
-                    continue
+            return _search_github_files_cached(owner, repo)
 
     except Exception as e:
         st.error(f"Ошибка поиска: {str(e)}")
+        return []
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _search_github_files_cached(owner, repo):
+    api_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/HEAD"
+    response = get_http_session().get(api_url, params={'recursive': '1'}, timeout=15)
+    response.raise_for_status()
+
+    files = []
+    for item in response.json().get('tree', []):
+        path = item.get('path', '')
+        if item.get('type') == 'blob' and path.lower().endswith(('.urdf', '.xacro')):
+            files.append({
+                'path': path,
+                'name': path.rsplit('/', 1)[-1],
+                'url': f"https://github.com/{owner}/{repo}/blob/HEAD/{path}"
+            })
 
     return sorted(files, key=lambda x: x['path'])
 
@@ -681,55 +795,50 @@ def get_github_commits(owner, repo, file_path):
         return []
 
     try:
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-        params = {'path': file_path, 'per_page': 20}
-        response = requests.get(url, params=params, timeout=10)
-
-        if response.status_code == 200:
-            commits_data = response.json()
-            commits = []
-            for commit in commits_data:
-                commits.append({
-                    'sha': commit['sha'][:8],
-                    'full_sha': commit['sha'],
-                    'message': commit['commit']['message'].strip(),
-                    'date': datetime.strptime(
-                        commit['commit']['committer']['date'][:19],
-                        '%Y-%m-%dT%H:%M:%S'
-                    ),
-                    'author': commit['commit']['author']['name']
-                })
-            return commits
+        return _get_github_commits_cached(owner, repo, file_path)
 
     except Exception as e:
         st.error(f"Ошибка: {str(e)}")
+        return []
 
-    return []
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_github_commits_cached(owner, repo, file_path):
+    url = f"https://api.github.com/repos/{owner}/{repo}/commits"
+    params = {'path': file_path, 'per_page': 20}
+    response = get_http_session().get(url, params=params, timeout=10)
+    response.raise_for_status()
+
+    return [{
+        'sha': commit['sha'][:8],
+        'full_sha': commit['sha'],
+        'message': commit['commit']['message'].strip(),
+        'date': datetime.fromisoformat(commit['commit']['committer']['date'][:19]),
+        'author': commit['commit']['author']['name']
+    } for commit in response.json()]
 
 def get_github_file_content(owner, repo, sha, file_path):
     if not LIBRARIES.get('requests'):
         return None
 
     try:
-        url = f"https://raw.githubusercontent.com/{owner}/{repo}/{sha}/{file_path}"
-        response = requests.get(url, timeout=10)
-
-        if response.status_code == 200:
-            return response.text
+        return _get_github_file_content_cached(owner, repo, sha, file_path)
+    except:
+        return None
 
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}?ref={sha}"
-        response = requests.get(url, timeout=10)
+@st.cache_data(ttl=600, show_spinner=False)
+def _get_github_file_content_cached(owner, repo, sha, file_path):
+    url = f"https://raw.githubusercontent.com/{owner}/{repo}/{sha}/{file_path}"
+    response = get_http_session().get(url, timeout=10)
 
-        if response.status_code == 200:
-            data = response.json()
-            if 'content' in data:
-                import base64
-                return base64.b64decode(data['content']).decode('utf-8')
+    if response.status_code == 200:
+        return response.text
 
-    except:
-        pass
+    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}?ref={sha}"
+    response = get_http_session().get(url, timeout=10)
+    response.raise_for_status()
 
-    return None
+    import base64
+    return base64.b64decode(response.json()['content']).decode('utf-8')
 
 def find_local_files(path):
     if not os.path.exists(path):
@@ -754,25 +863,41 @@ def get_local_commits(repo_path, file_path):
         return []
 
     try:
-        repo = git.Repo(repo_path)
-        commits = list(repo.iter_commits(paths=file_path, max_count=20))
-
-        return [{
-            'sha': c.hexsha[:8],
-            'full_sha': c.hexsha,
-            'message': c.message.strip(),
-            'date': c.committed_datetime,
-            'author': c.author.name
-        } for c in commits]
+        import git
+        head = git.Repo(repo_path).head.commit.hexsha
+        return _get_local_commits_cached(repo_path, file_path, head)
 
     except Exception as e:
         st.error(f"Ошибка Git: {str(e)}")
         return []
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def _get_local_commits_cached(repo_path, file_path, head):
+    import git
+    repo = git.Repo(repo_path)
+    commits = list(repo.iter_commits(head, paths=file_path, max_count=20))
+
+    return [{
+        'sha': c.hexsha[:8],
+        'full_sha': c.hexsha,
+        'message': c.message.strip(),
+        'date': c.committed_datetime,
+        'author': c.author.name
+    } for c in commits]
+
+def add_commit_labels(commits):
+    for c in commits:
+        message = c['message']
+        c['datetime_str'] = c['date'].strftime('%Y-%m-%d %H:%M')
+        c['date_str'] = c['datetime_str'][:10]
+        c['short_label'] = f"{c['sha']} - {message[:30]}..."
+        c['label'] = f"{c['sha']} - {message[:40]}... - {c['date_str']}"
+        c['table_message'] = message[:80] + "..." if len(message) > 80 else message
+    return commits
+
 def get_local_file_content(repo_path, sha, file_path):
     try:
-        repo = git.Repo(repo_path)
-        return repo.git.show(f"{sha}:{file_path}")
+        return _get_local_file_content_cached(repo_path, sha, file_path)
     except:
         try:
             with open(os.path.join(repo_path, file_path), 'r') as f:
@@ -780,30 +905,66 @@ def get_local_file_content(repo_path, sha, file_path):
         except:
             return None
 
+@st.cache_data(max_entries=128, show_spinner=False)
+def _get_local_file_content_cached(repo_path, sha, file_path):
+    import git
+    repo = git.Repo(repo_path)
+    return repo.git.show(f"{sha}:{file_path}")
+
+def count_urdf_tokens(content):
+    return Counter(match.group(match.lastindex).lower() for match in _URDF_TOKEN_RE.finditer(content))
+
 def parse_urdf_structure(content):
     if not content:
         return {'links': [], 'joints': [], 'graph': None}
 
-    links = re.findall(r'<link\s+name="([^"]+)"', content)
+    return _parse_urdf_structure_cached(content)
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def _parse_urdf_structure_cached(content):
+    links = []
     joints = []
-    joint_pattern = r'<joint\s+name="([^"]+)".*?<parent\s+link="([^"]+)".*?<child\s+link="([^"]+)"'
-    for match in re.finditer(joint_pattern, content, re.DOTALL):
-        joints.append({
-            'name': match.group(1),
-            'parent': match.group(2),
-            'child': match.group(3)
-        })
+
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        root = None
+
+    if root is not None:
+        for link in root.iter('link'):
+            if link.get('name'):
+                links.append(link.get('name'))
+
+        for joint in root.iter('joint'):
+            parent = joint.find('parent')
+            child = joint.find('child')
+            if parent is not None and child is not None and parent.get('link') and child.get('link'):
+                joints.append({
+                    'name': joint.get('name'),
+                    'parent': parent.get('link'),
+                    'child': child.get('link')
+                })
+    else:
+        links = _LINK_NAME_RE.findall(content)
+
+        for match in _JOINT_LINKS_RE.finditer(content):
+            joints.append({
+                'name': match.group(1),
+                'parent': match.group(2),
+                'child': match.group(3)
+            })
 
     G = None
     if LIBRARIES.get('networkx') and (links or joints):
+        import networkx as nx
         G = nx.DiGraph()
 
         for link in links:
             G.add_node(link, type='link')
 
+        links_set = set(links)
         for joint in joints:
-            if joint['parent'] in links and joint['child'] in links:
+            if joint['parent'] in links_set and joint['child'] in links_set:
                 G.add_edge(joint['parent'], joint['child'],
                           label=joint['name'], type='joint')
 
@@ -814,39 +975,49 @@ def parse_urdf_structure(content):
     }
 
 def create_hierarchical_diagram(structure, title="Иерархия URDF"):
-    if not LIBRARIES.get('matplotlib') or not structure['links']:
+    joints = tuple((j['name'], j['parent'], j['child']) for j in structure['joints'])
+    return _create_hierarchical_diagram_cached(tuple(structure['links']), joints, title)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _create_hierarchical_diagram_cached(links, joints, title):
+    if not LIBRARIES.get('matplotlib') or not links:
         return None
 
     try:
-        fig, ax = plt.subplots(figsize=(10, 8), facecolor='white')
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.patches import Rectangle
+        from matplotlib.collections import PatchCollection, LineCollection
 
-        links = structure['links']
-        joints = structure['joints']
+        fig = Figure(figsize=(10, 8), facecolor='white')
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
 
-        all_parents = set(j['parent'] for j in joints)
-        all_children = set(j['child'] for j in joints)
+        all_parents = set(parent for _, parent, _ in joints)
+        all_children = set(child for _, _, child in joints)
         root_nodes = [link for link in links if link not in all_children]
 
         if not root_nodes and links:
             root_nodes = [links[0]]
 
-        hierarchy = {}
-
-        def build_hierarchy(node, depth=0):
-            if depth > 10:
-                return
-
-            if node not in hierarchy:
-                hierarchy[node] = {'depth': depth, 'children': []}
-
-            for joint in joints:
-                if joint['parent'] == node:
-                    child = joint['child']
-                    hierarchy[node]['children'].append(child)
-                    build_hierarchy(child, depth + 1)
+        children_of = defaultdict(list)
+        for _, parent, child in joints:
+            children_of[parent].append(child)
 
+        hierarchy = {}
+        queue = deque()
         for root in root_nodes:
-            build_hierarchy(root)
+            if root not in hierarchy:
+                hierarchy[root] = {'depth': 0, 'children': children_of[root]}
+                queue.append(root)
+
+        while queue:
+            node = queue.popleft()
+            depth = hierarchy[node]['depth'] + 1
+            for child in children_of[node]:
+                if child not in hierarchy:
+                    hierarchy[child] = {'depth': depth, 'children': children_of[child]}
+                    queue.append(child)
 
         positions = {}
         y_positions = {}
@@ -868,52 +1039,33 @@ def create_hierarchical_diagram(structure, title="Иерархия URDF"):
             for i, node in enumerate(sorted(nodes)):
                 positions[node] = ((i + 1) * x_spacing - 5, y_positions[node])
 
+        rects = []
+        colors = []
         for node, (x, y) in positions.items():
-            node_lower = node.lower()
-            if 'base' in node_lower or 'root' in node_lower:
-                color = '#3498db'
-            elif 'wheel' in node_lower:
-                color = '#e74c3c'
-            elif 'camera' in node_lower or 'sensor' in node_lower:
-                color = '#9b59b6'
-            elif 'gripper' in node_lower or 'hand' in node_lower:
-                color = '#1abc9c'
-            elif 'link' in node_lower:
-                color = '#2ecc71'
-            else:
-                color = '#7f8c8d'
-
-            rect = Rectangle((x - 0.4, y - 0.15), 0.8, 0.3,
-                           facecolor=color, edgecolor='#2c3e50',
-                           linewidth=2, alpha=0.9, zorder=3)
-            ax.add_patch(rect)
+            match = _NODE_TYPE_RE.match(node.lower())
+            colors.append(_NODE_COLORS[match.lastgroup] if match else '#7f8c8d')
+            rects.append(Rectangle((x - 0.4, y - 0.15), 0.8, 0.3))
 
             ax.text(x, y, node, ha='center', va='center',
                    fontsize=9, fontweight='bold', color='white',
                    zorder=4)
 
-        for joint in joints:
-            parent = joint['parent']
-            child = joint['child']
+        if rects:
+            ax.add_collection(PatchCollection(rects, facecolors=colors, edgecolors='#2c3e50',
+                                              linewidths=2, alpha=0.9, zorder=3))
 
+        edges = []
+        for joint_name, parent, child in joints:
             if parent in positions and child in positions:
                 x1, y1 = positions[parent]
                 x2, y2 = positions[child]
 
-                ax.plot([x1, x2], [y1 + 0.15, y2 - 0.15],
-                       color='#e74c3c', linewidth=2,
-                       alpha=0.7, zorder=1)
-
-                ax.annotate('', xy=(x2, y2 - 0.15), xytext=(x1, y1 + 0.15),
-                           arrowprops=dict(arrowstyle='->',
-                                         color='#e74c3c',
-                                         linewidth=2,
-                                         alpha=0.7))
+                edges.append(((x1, y1 + 0.15), (x2, y2 - 0.15)))
 
                 mid_x = (x1 + x2) / 2
                 mid_y = (y1 + y2) / 2
 
-                joint_name_short = joint['name'][:15] + '...' if len(joint['name']) > 15 else joint['name']
+                joint_name_short = joint_name[:15] + '...' if len(joint_name) > 15 else joint_name
                 ax.text(mid_x, mid_y - 0.1, joint_name_short,
                        ha='center', va='center',
                        fontsize=8, color='#c0392b',
@@ -923,6 +1075,10 @@ def create_hierarchical_diagram(structure, title="Иерархия URDF"):
                                 alpha=0.8),
                        zorder=2)
 
+        if edges:
+            ax.add_collection(LineCollection(edges, colors='#e74c3c', linewidths=2,
+                                             alpha=0.7, zorder=1))
+
         ax.set_xlim(-6, 6)
         ax.set_ylim(-1, max_depth + 2 if max_depth > 0 else 3)
         ax.set_aspect('equal')
@@ -937,12 +1093,11 @@ def create_hierarchical_diagram(structure, title="Иерархия URDF"):
                verticalalignment='top',
                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
 
-        plt.tight_layout()
+        fig.tight_layout()
 
         buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+        fig.savefig(buf, format='png', dpi=90)
         buf.seek(0)
-        plt.close(fig)
 
         return buf
 
@@ -950,20 +1105,21 @@ def create_hierarchical_diagram(structure, title="Иерархия URDF"):
         st.error(f"Ошибка создания иерархической диаграммы: {str(e)}")
         return None
 
-def create_component_visualization(content, title="Визуализация компонентов URDF"):
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_component_visualization(stats, title="Визуализация компонентов URDF"):
     if not LIBRARIES.get('matplotlib'):
         return None
 
     try:
-        links = re.findall(r'<link\s+name="([^"]+)"', content)
-        joints = re.findall(r'<joint\s+name="([^"]+)"', content)
-        visuals = re.findall(r'<visual>', content, re.IGNORECASE)
-        collisions = re.findall(r'<collision>', content, re.IGNORECASE)
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-        fig, ax = plt.subplots(figsize=(10, 6), facecolor='white')
+        fig = Figure(figsize=(10, 6), facecolor='white')
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
 
         categories = ['Линки', 'Соединения', 'Визуалы', 'Коллизии']
-        values = [len(links), len(joints), len(visuals), len(collisions)]
+        values = [stats['links'], stats['joints'], stats['visuals'], stats['collisions']]
         colors = ['#3498db', '#e74c3c', '#2ecc71', '#9b59b6']
 
         bars = ax.bar(categories, values, color=colors, edgecolor='#2c3e50', linewidth=2)
@@ -982,12 +1138,7 @@ def create_component_visualization(content, title="Визуализация ко
         total_elements = sum(values)
         info_text = f"Всего элементов: {total_elements}\n"
 
-        joint_types = {
-            'revolute': len(re.findall(r'type="revolute"', content, re.IGNORECASE)),
-            'prismatic': len(re.findall(r'type="prismatic"', content, re.IGNORECASE)),
-            'fixed': len(re.findall(r'type="fixed"', content, re.IGNORECASE)),
-            'continuous': len(re.findall(r'type="continuous"', content, re.IGNORECASE))
-        }
+        joint_types = stats['joint_types']
 
         if sum(joint_types.values()) > 0:
             info_text += "\nТипы соединений:\n"
@@ -995,12 +1146,7 @@ def create_component_visualization(content, title="Визуализация ко
                 if count > 0:
                     info_text += f"  {j_type}: {count}\n"
 
-        geometries = {
-            'box': len(re.findall(r'<box', content, re.IGNORECASE)),
-            'cylinder': len(re.findall(r'<cylinder', content, re.IGNORECASE)),
-            'sphere': len(re.findall(r'<sphere', content, re.IGNORECASE)),
-            'mesh': len(re.findall(r'<mesh', content, re.IGNORECASE))
-        }
+        geometries = stats['geometries']
 
         if sum(geometries.values()) > 0:
             info_text += "\nГеометрии:\n"
@@ -1015,12 +1161,11 @@ def create_component_visualization(content, title="Визуализация ко
                bbox=dict(boxstyle='round', facecolor='#f8f9fa',
                         edgecolor='#dee2e6', alpha=0.9))
 
-        plt.tight_layout()
+        fig.tight_layout()
 
         buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
         buf.seek(0)
-        plt.close(fig)
 
         return buf
 
@@ -1036,6 +1181,44 @@ def get_file_content_for_commit(source, repo_info, sha, file_path):
         owner, repo = repo_info
         return get_github_file_content(owner, repo, sha, file_path)
 
+def line_ids(old_lines, new_lines):
+    ids = {}
+    return (
+        [ids.setdefault(line, len(ids)) for line in old_lines],
+        [ids.setdefault(line, len(ids)) for line in new_lines]
+    )
+
+def format_unified_range(start, stop):
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+def iter_unified_diff(old_lines, new_lines, fromfile, tofile):
+    old_ids, new_ids = line_ids(old_lines, new_lines)
+    matcher = difflib.SequenceMatcher(a=old_ids, b=new_ids, autojunk=False)
+
+    for index, group in enumerate(matcher.get_grouped_opcodes(3)):
+        if index == 0:
+            yield f"--- {fromfile}"
+            yield f"+++ {tofile}"
+
+        first, last = group[0], group[-1]
+        yield (f"@@ -{format_unified_range(first[1], last[2])} "
+               f"+{format_unified_range(first[3], last[4])} @@")
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in old_lines[i1:i2]:
+                    yield ' ' + line
+                continue
+            for line in old_lines[i1:i2]:
+                yield '-' + line
+            for line in new_lines[j1:j2]:
+                yield '+' + line
+
 def compare_commits(old_content, new_content, old_sha, new_sha):
     if not old_content or not new_content:
         return None
@@ -1043,16 +1226,22 @@ def compare_commits(old_content, new_content, old_sha, new_sha):
     old_lines = old_content.splitlines()
     new_lines = new_content.splitlines()
 
-    diff = list(difflib.unified_diff(
-        old_lines,
-        new_lines,
-        fromfile=f"a/{old_sha[:8]}",
-        tofile=f"b/{new_sha[:8]}",
-        lineterm=""
-    ))
+    diff = iter_unified_diff(old_lines, new_lines, f"a/{old_sha[:8]}", f"b/{new_sha[:8]}")
+
+    first = next(diff, None)
+    if first is None:
+        return None
+
+    return itertools.chain([first], diff)
 
-    return diff
+def classify_change_line(line):
+    line_lower = line.lower()
+    for token, kind in CHANGE_KINDS:
+        if token in line_lower:
+            return kind
+    return None
 
+@st.cache_data(max_entries=32, show_spinner=False)
 def analyze_code_changes(old_content, new_content):
     if not old_content or not new_content:
         return {}
@@ -1060,7 +1249,8 @@ def analyze_code_changes(old_content, new_content):
     old_lines = old_content.splitlines()
     new_lines = new_content.splitlines()
 
-    diff = list(difflib.ndiff(old_lines, new_lines))
+    old_ids, new_ids = line_ids(old_lines, new_lines)
+    matcher = difflib.SequenceMatcher(a=old_ids, b=new_ids, autojunk=False)
 
     changes = {
         'added_lines': 0,
@@ -1071,41 +1261,41 @@ def analyze_code_changes(old_content, new_content):
         'line_changes': []
     }
 
-    for line in diff:
-        if line.startswith('+ ') and not line.startswith('++'):
-            changes['added_lines'] += 1
-            changes['line_changes'].append(('+', line[2:]))
-        elif line.startswith('- ') and not line.startswith('--'):
-            changes['removed_lines'] += 1
-            changes['line_changes'].append(('-', line[2:]))
-        elif line.startswith('  '):
-            changes['unchanged_lines'] += 1
-        elif line.startswith('? '):
-            changes['modified_lines'] += 1
-
-    for change_type, line in changes['line_changes'][:100]:
-        line_lower = line.lower()
-        if '<link' in line_lower:
-            changes['changes_by_type']['link'] += 1
-        elif '<joint' in line_lower:
-            changes['changes_by_type']['joint'] += 1
-        elif '<visual' in line_lower:
-            changes['changes_by_type']['visual'] += 1
-        elif '<collision' in line_lower:
-            changes['changes_by_type']['collision'] += 1
-        elif '<origin' in line_lower:
-            changes['changes_by_type']['origin'] += 1
-        elif '<geometry' in line_lower:
-            changes['changes_by_type']['geometry'] += 1
-        elif '<material' in line_lower:
-            changes['changes_by_type']['material'] += 1
-        elif 'name="' in line_lower:
-            changes['changes_by_type']['name'] += 1
-        elif 'xyz="' in line_lower or 'rpy="' in line_lower:
-            changes['changes_by_type']['pose'] += 1
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            changes['unchanged_lines'] += i2 - i1
+            continue
+
+        if tag == 'replace':
+            changes['modified_lines'] += max(i2 - i1, j2 - j1)
+
+        changes['removed_lines'] += i2 - i1
+        changes['added_lines'] += j2 - j1
+        changes['line_changes'].extend(('-', line) for line in old_lines[i1:i2])
+        changes['line_changes'].extend(('+', line) for line in new_lines[j1:j2])
+
+    changes['changes_by_type'].update(
+        kind
+        for kind in map(classify_change_line, (line for _, line in changes['line_changes'][:100]))
+        if kind
+    )
 
     return changes
 
+DIFF_STYLE = (
+    "<style>"
+    ".dh{padding:5px;font-family:monospace;white-space:pre-wrap}"
+    ".dh-file{color:#6c757d}"
+    ".dh-hunk{background:#e9ecef;color:#495057;font-weight:bold}"
+    ".dh-add{background:#d4edda;color:#155724;border-left:3px solid #28a745;margin-left:10px}"
+    ".dh-del{background:#f8d7da;color:#721c24;border-left:3px solid #dc3545;margin-left:10px}"
+    ".dh-ctx{color:#212529}"
+    ".dh-more{color:#666;font-weight:bold}"
+    "</style>"
+)
+
+DIFF_LINE_CLASSES = {'@': 'dh dh-hunk', '+': 'dh dh-add', '-': 'dh dh-del'}
+
 def create_diff_html(diff_lines, max_lines=200):
     if not diff_lines:
         return "<div style='padding: 20px; background: #f8f9fa; border-radius: 5px;'>Нет изменений</div>"
@@ -1113,26 +1303,29 @@ def create_diff_html(diff_lines, max_lines=200):
     html_lines = []
     line_count = 0
 
-    for line in diff_lines:
+    for line in itertools.islice(diff_lines, max_lines + 1):
         if line_count >= max_lines:
-            html_lines.append("<div style='color: #666; padding: 5px; font-weight: bold;'>...</div>")
+            html_lines.append("<div class='dh dh-more'>...</div>")
             break
 
-        if line.startswith('---') or line.startswith('+++'):
-            html_lines.append(f"<div style='color: #6c757d; padding: 5px; font-family: monospace;'>{line}</div>")
-        elif line.startswith('@@'):
-            html_lines.append(f"<div style='background: #e9ecef; color: #495057; padding: 5px; font-family: monospace; font-weight: bold;'>{line}</div>")
-        elif line.startswith('+'):
-            html_lines.append(f"<div style='background: #d4edda; color: #155724; padding: 5px; font-family: monospace; border-left: 3px solid #28a745; margin-left: 10px;'>{line}</div>")
-        elif line.startswith('-'):
-            html_lines.append(f"<div style='background: #f8d7da; color: #721c24; padding: 5px; font-family: monospace; border-left: 3px solid #dc3545; margin-left: 10px;'>{line}</div>")
+        if line.startswith(('---', '+++')):
+            css_class = 'dh dh-file'
         else:
-            html_lines.append(f"<div style='color: #212529; padding: 5px; font-family: monospace;'>{line}</div>")
+            css_class = DIFF_LINE_CLASSES.get(line[:1], 'dh dh-ctx')
 
+        html_lines.append(f"<div class='{css_class}'>{html.escape(line)}</div>")
         line_count += 1
 
-    return f"<div style='max-height: 500px; overflow-y: auto; border: 1px solid #dee2e6; border-radius: 5px;'>{''.join(html_lines)}</div>"
+    return f"{DIFF_STYLE}<div style='max-height: 500px; overflow-y: auto; border: 1px solid #dee2e6; border-radius: 5px;'>{''.join(html_lines)}</div>"
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_commit_diff_html(old_content, new_content, old_sha, new_sha):
+    diff_result = compare_commits(old_content, new_content, old_sha, new_sha)
+    if not diff_result:
+        return None
+    return create_diff_html(diff_result)
 
+@st.cache_data(max_entries=32, show_spinner=False)
 def create_change_stats_chart(changes):
     if not changes:
         return None
@@ -1145,6 +1338,9 @@ def create_change_stats_chart(changes):
         changes.get('unchanged_lines', 0)
     ]
 
+    if not any(values):
+        return None
+
     colors = ['#28a745', '#dc3545', '#ffc107', '#6c757d']
 
     fig = go.Figure(data=[
@@ -1171,6 +1367,7 @@ def create_change_stats_chart(changes):
 
     return fig
 
+@st.cache_data(max_entries=32, show_spinner=False)
 def create_element_changes_chart(changes):
     if not changes or not changes.get('changes_by_type'):
         return None
@@ -1181,6 +1378,8 @@ def create_element_changes_chart(changes):
 
     elements = list(element_changes.keys())
     counts = list(element_changes.values())
+    if sum(counts) == 0:
+        return None
 
     element_names_ru = {
         'link': 'Линки',
@@ -1201,7 +1400,7 @@ def create_element_changes_chart(changes):
             labels=elements_ru,
             values=counts,
             hole=.3,
-            marker=dict(colors=px.colors.qualitative.Set3)
+            marker=dict(colors=ELEMENT_PALETTE)
         )
     ])
 
@@ -1220,27 +1419,35 @@ def create_element_changes_chart(changes):
 
     return fig
 
-def create_commit_graph(commits, selected_idx):
+def get_author_colors(commits):
+    return build_author_colors(tuple(dict.fromkeys(c['author'] for c in commits)))
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_author_colors(authors):
+    return {author: AUTHOR_PALETTE[i % len(AUTHOR_PALETTE)] for i, author in enumerate(authors)}
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_commit_graph(commits, selected_idx, author_colors=None):
     if not LIBRARIES.get('plotly'):
         return None
 
     try:
-        dates = [c['date'] for c in commits]
-        authors = [c['author'] for c in commits]
-        messages = [c['message'][:50] + "..." if len(c['message']) > 50 else c['message']
-                   for c in commits]
-        shas = [c['sha'] for c in commits]
-
-        unique_authors = list(set(authors))
-        color_map = {}
-        colors = px.colors.qualitative.Plotly
-
-        for i, author in enumerate(unique_authors):
-            color_map[author] = colors[i % len(colors)]
-
-        colors = [color_map[author] for author in authors]
-
-        sizes = [12 if i == selected_idx else 8 for i in range(len(commits))]
+        if author_colors is None:
+            author_colors = get_author_colors(commits)
+
+        dates = []
+        shas = []
+        colors = []
+        hovertext = []
+        for c in commits:
+            dates.append(c['date'])
+            shas.append(c['sha'])
+            colors.append(author_colors[c['author']])
+            hovertext.append(f"{c['sha']}: {c['message']}<br>Автор: {c['author']}")
+
+        sizes = [8] * len(commits)
+        if 0 <= selected_idx < len(commits):
+            sizes[selected_idx] = 12
 
         fig = go.Figure()
 
@@ -1255,16 +1462,15 @@ def create_commit_graph(commits, selected_idx):
             ),
             text=shas,
             textposition="top center",
-            hovertext=[f"{c['sha']}: {c['message']}<br>Автор: {c['author']}"
-                      for c in commits],
+            hovertext=hovertext,
             hoverinfo='text',
             name="Коммиты"
         ))
 
-        for i in range(len(dates)-1):
+        if len(dates) > 1:
             fig.add_trace(go.Scatter(
-                x=[dates[i], dates[i+1]],
-                y=[1, 1],
+                x=dates,
+                y=[1] * len(dates),
                 mode='lines',
                 line=dict(color='gray', width=2, dash='dash'),
                 showlegend=False,
@@ -1315,18 +1521,17 @@ def create_commit_graph(commits, selected_idx):
         st.error(f"Ошибка создания графика: {str(e)}")
         return None
 
-def create_author_stats(commits):
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_author_stats(commits, author_colors=None):
     if not commits:
         return None
 
-    author_counts = {}
-    for commit in commits:
-        author = commit['author']
-        author_counts[author] = author_counts.get(author, 0) + 1
-
-    sorted_authors = sorted(author_counts.items(), key=lambda x: x[1], reverse=True)
+    sorted_authors = Counter(c['author'] for c in commits).most_common()
 
     if LIBRARIES.get('plotly'):
+        if author_colors is None:
+            author_colors = get_author_colors(commits)
+
         authors = [a[0] for a in sorted_authors]
         counts = [a[1] for a in sorted_authors]
 
@@ -1334,7 +1539,7 @@ def create_author_stats(commits):
             go.Bar(
                 x=authors,
                 y=counts,
-                marker_color=px.colors.qualitative.Plotly[:len(authors)]
+                marker_color=[author_colors[author] for author in authors]
             )
         ])
 
@@ -1354,24 +1559,58 @@ def create_author_stats(commits):
     else:
         return sorted_authors
 
+FREQUENCY_NUMPY_THRESHOLD = 1000
+FREQUENCY_MAX_POINTS = 2000
+
+def downsample_lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return list(range(n))
+
+    every = (n - 2) / (n_out - 2)
+    indices = [0]
+    a = 0
+
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        avg_x = sum(x[end:next_end]) / (next_end - end)
+        avg_y = sum(y[end:next_end]) / (next_end - end)
+
+        a = max(
+            range(start, end),
+            key=lambda j: abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+        )
+        indices.append(a)
+
+    indices.append(n - 1)
+    return indices
+
+@st.cache_data(max_entries=32, show_spinner=False)
 def create_commit_frequency_chart(commits):
     if not LIBRARIES.get('plotly') or not commits:
         return None
 
-    dates = [c['date'] for c in commits]
-
-    date_counts = {}
-    for date in dates:
-        date_str = date.strftime('%Y-%m-%d')
-        date_counts[date_str] = date_counts.get(date_str, 0) + 1
-
-    sorted_dates = sorted(date_counts.items())
+    if LIBRARIES.get('numpy') and len(commits) >= FREQUENCY_NUMPY_THRESHOLD:
+        import numpy as np
+        dates, counts = np.unique(np.array([c['date_str'] for c in commits]), return_counts=True)
+        dates_list = dates.tolist()
+        counts_list = counts.tolist()
+    else:
+        sorted_dates = sorted(Counter(c['date_str'] for c in commits).items())
+        dates_list = [d[0] for d in sorted_dates]
+        counts_list = [d[1] for d in sorted_dates]
 
-    if len(sorted_dates) < 2:
+    if len(dates_list) < 2:
         return None
 
-    dates_list = [d[0] for d in sorted_dates]
-    counts_list = [d[1] for d in sorted_dates]
+    if len(dates_list) > FREQUENCY_MAX_POINTS:
+        days = [datetime.strptime(d, '%Y-%m-%d').toordinal() for d in dates_list]
+        keep = downsample_lttb(days, counts_list, FREQUENCY_MAX_POINTS)
+        dates_list = [dates_list[i] for i in keep]
+        counts_list = [counts_list[i] for i in keep]
 
     fig = go.Figure(data=[
         go.Scatter(
@@ -1397,18 +1636,20 @@ def create_commit_frequency_chart(commits):
 
     return fig
 
+@st.cache_data(max_entries=32, show_spinner=False)
 def analyze_urdf(content):
+    counts = count_urdf_tokens(content)
+
     stats = {
-        'links': len(re.findall(r'<link\s', content)),
-        'joints': len(re.findall(r'<joint\s', content)),
-        'visuals': len(re.findall(r'<visual>', content, re.IGNORECASE)),
-        'collisions': len(re.findall(r'<collision>', content, re.IGNORECASE)),
+        'links': counts['link'],
+        'joints': counts['joint'],
+        'visuals': counts['visual'],
+        'collisions': counts['collision'],
         'lines': len(content.splitlines()),
-        'size': 'Не указан',
-        'structure': parse_urdf_structure(content)
+        'size': 'Не указан'
     }
 
-    size_match = re.search(r'size="([\d\.\s]+)"', content)
+    size_match = _SIZE_RE.search(content)
     if size_match:
         try:
             sizes = list(map(float, size_match.group(1).split()))
@@ -1417,7 +1658,7 @@ def analyze_urdf(content):
         except:
             pass
 
-    mass_match = re.search(r'mass\s*value\s*=\s*"([\d\.]+)"', content)
+    mass_match = _MASS_RE.search(content)
     if mass_match:
         try:
             mass = float(mass_match.group(1))
@@ -1425,24 +1666,195 @@ def analyze_urdf(content):
         except:
             stats['mass'] = "Не указана"
 
-    joint_types = {
-        'revolute': len(re.findall(r'type="revolute"', content, re.IGNORECASE)),
-        'prismatic': len(re.findall(r'type="prismatic"', content, re.IGNORECASE)),
-        'fixed': len(re.findall(r'type="fixed"', content, re.IGNORECASE)),
-        'continuous': len(re.findall(r'type="continuous"', content, re.IGNORECASE))
-    }
+    joint_types = {joint_type: counts[joint_type] for joint_type in JOINT_TYPES}
     stats['joint_types'] = joint_types
 
-    geometries = {
-        'box': len(re.findall(r'<box', content, re.IGNORECASE)),
-        'cylinder': len(re.findall(r'<cylinder', content, re.IGNORECASE)),
-        'sphere': len(re.findall(r'<sphere', content, re.IGNORECASE)),
-        'mesh': len(re.findall(r'<mesh', content, re.IGNORECASE))
-    }
+    geometries = {geometry: counts[geometry] for geometry in GEOMETRY_TYPES}
     stats['geometries'] = geometries
 
     return stats
 
+CODE_PREVIEW_LINES = 200
+ELEMENT_CHANGES_TOP_K = 20
+COMPARISON_VIEWS = ("Графики изменений", "Diff изменений", "Полный код")
+STAT_DIFF_FIELDS = (
+    ('links', 'Линков'),
+    ('joints', 'Соединений'),
+    ('visuals', 'Визуалов'),
+    ('collisions', 'Коллизий'),
+)
+
+def render_code_preview(content, key):
+    lines = content.splitlines()
+
+    if len(lines) > CODE_PREVIEW_LINES and not st.checkbox("Показать полностью", key=key):
+        st.code("\n".join(lines[:CODE_PREVIEW_LINES]), language="xml", line_numbers=True)
+        st.caption(f"Показано {CODE_PREVIEW_LINES} из {len(lines)} строк")
+    else:
+        st.code(content, language="xml", line_numbers=True)
+
+@fragment
+def render_commit_comparison(old_commit, new_commit, old_content, new_content):
+    col_info1, col_info2 = st.columns(2)
+
+    with col_info1:
+        with st.expander(f"Старый коммит: {old_commit['sha']}", expanded=True):
+            st.metric("Хэш", old_commit['sha'])
+            st.metric("Автор", old_commit['author'])
+            st.metric("Дата", old_commit['datetime_str'])
+            st.info(f"**Сообщение:** {old_commit['message']}")
+
+            old_stats = analyze_urdf(old_content)
+            st.metric("Линков", old_stats['links'])
+            st.metric("Соединений", old_stats['joints'])
+
+    with col_info2:
+        with st.expander(f"Новый коммит: {new_commit['sha']}", expanded=True):
+            st.metric("Хэш", new_commit['sha'])
+            st.metric("Автор", new_commit['author'])
+            st.metric("Дата", new_commit['datetime_str'])
+            st.info(f"**Сообщение:** {new_commit['message']}")
+
+            new_stats = analyze_urdf(new_content)
+            st.metric("Линков", new_stats['links'])
+            st.metric("Соединений", new_stats['joints'])
+
+    st.subheader("Разница в статистике")
+
+    old_values = [old_stats[key] for key, _ in STAT_DIFF_FIELDS]
+    new_values = [new_stats[key] for key, _ in STAT_DIFF_FIELDS]
+
+    st.dataframe(
+        {
+            "Метрика": [label for _, label in STAT_DIFF_FIELDS],
+            "Старый": old_values,
+            "Новый": new_values,
+            "Δ": [f"{new - old:+d}" for old, new in zip(old_values, new_values)]
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+
+    view = st.radio(
+        "Вид сравнения:",
+        COMPARISON_VIEWS,
+        horizontal=True,
+        label_visibility="collapsed",
+        key="comparison_view"
+    )
+
+    if view == COMPARISON_VIEWS[0]:
+        changes = analyze_code_changes(old_content, new_content)
+
+        col_graph1, col_graph2 = st.columns(2)
+
+        with col_graph1:
+            changes_chart = create_change_stats_chart(changes)
+            if changes_chart:
+                st.plotly_chart(changes_chart, use_container_width=True)
+            else:
+                st.info("Нет данных для построения графика изменений")
+
+        with col_graph2:
+            element_chart = create_element_changes_chart(changes)
+            if element_chart:
+                st.plotly_chart(element_chart, use_container_width=True)
+            else:
+                st.info("Нет изменений элементов URDF")
+
+        if changes:
+            st.subheader("Детальная статистика изменений")
+
+            stats_cols = st.columns(4)
+            with stats_cols[0]:
+                st.metric("Добавлено строк", changes.get('added_lines', 0))
+            with stats_cols[1]:
+                st.metric("Удалено строк", changes.get('removed_lines', 0))
+            with stats_cols[2]:
+                st.metric("Изменено строк", changes.get('modified_lines', 0))
+            with stats_cols[3]:
+                st.metric("Всего строк", changes.get('unchanged_lines', 0))
+
+            if changes.get('changes_by_type'):
+                st.write("**Изменения по элементам URDF:**")
+                element_changes = changes['changes_by_type']
+                for elem_type, count in element_changes.most_common(ELEMENT_CHANGES_TOP_K):
+                    st.write(f"- **{elem_type}**: {count} изменений")
+
+    elif view == COMPARISON_VIEWS[1]:
+        st.subheader("Разница между коммитами")
+        st.caption(f"Сравнение {old_commit['sha']} → {new_commit['sha']}")
+
+        diff_html = create_commit_diff_html(old_content, new_content,
+                                            old_commit['sha'], new_commit['sha'])
+        if diff_html:
+            components.html(diff_html, height=500, scrolling=True)
+        else:
+            st.info("Нет различий между коммитами или не удалось загрузить данные")
+
+    else:
+        col_code1, col_code2 = st.columns(2)
+
+        with col_code1:
+            st.subheader(f"Код коммита {old_commit['sha']}")
+            render_code_preview(old_content, "show_full_old")
+
+        with col_code2:
+            st.subheader(f"Код коммита {new_commit['sha']}")
+            render_code_preview(new_content, "show_full_new")
+
+MD_EXAMPLES = """
+### Популярные репозитории с моделями роботов:
+
+**Для обучения:**
+- `https://github.com/ros/urdf_tutorial` - Учебные примеры URDF (рекомендуется)
+- `https://github.com/ros-industrial/universal_robot` - Промышленные роботы UR
+- `https://github.com/ros-simulation/gazebo_ros_demos` - Демо для Gazebo
+
+**Готовые модели:**
+- `https://github.com/ros-industrial/fanuc` - Роботы Fanuc
+- `https://github.com/PR2/pr2_common` - PR2 робот
+- `https://github.com/turtlebot/turtlebot` - TurtleBot
+
+**Примеры файлов для просмотра:**
+- `urdf/01-myfirst.urdf` - Простейший робот
+- `urdf/03-origins.urdf` - Сложная геометрия
+- `urdf/08-macroed.urdf.xacro` - XACRO файлы
+"""
+
+MD_INSTALL = """
+**Для полной функциональности (включая 3D):**
+```bash
+pip install streamlit gitpython requests plotly numpy networkx matplotlib PyOpenGL PyOpenGL-accelerate
+```
+
+**Минимальный набор для работы:**
+```bash
+pip install streamlit gitpython requests
+```
+"""
+
+MD_INSTRUCTIONS = """
+1. Вставьте URL GitHub репозитория (например `https://github.com/ros/urdf_tutorial`)
+2. Нажмите "Найти URDF файлы"
+3. Выберите файл из списка
+4. Нажмите "Показать историю коммитов"
+5. Выберите два коммита для сравнения или один для визуализации
+"""
+
+MD_FEATURES = """
+- 3D визуализация URDF моделей в отдельном системном окне
+- 2D визуализация структуры URDF
+- Иерархические диаграммы
+- Статистика компонентов
+- Сравнение двух коммитов
+- Графики изменений кода
+- Анализ по авторам
+- График частоты коммитов
+- Diff между коммитами
+- Полные коды версий для сравненияч
+"""
+
 def main():
     st.set_page_config(
         page_title="URDF Commit Viewer",
@@ -1542,7 +1954,7 @@ def main():
 
                 if commits:
                     st.session_state.selected_file = selected_file
-                    st.session_state.commits = commits
+                    st.session_state.commits = add_commit_labels(commits)
                     st.success(f"Загружено коммитов: {len(commits)}")
                 else:
                     st.warning("Не удалось загрузить историю коммитов")
@@ -1561,10 +1973,7 @@ def main():
             viz_commit_idx = st.selectbox(
                 "Выберите коммит для визуализации:",
                 range(len(commits)),
-                format_func=lambda i: (
-                    f"{commits[i]['sha']} - "
-                    f"{commits[i]['message'][:30]}..."
-                ),
+                format_func=lambda i: commits[i]['short_label'],
                 key="viz_commit_selector"
             )
 
@@ -1673,7 +2082,7 @@ def main():
                 st.caption("Количественный анализ элементов URDF")
 
                 component_diagram = create_component_visualization(
-                    content,
+                    stats,
                     f"Компоненты URDF - Коммит {selected_commit['sha'][:8]}"
                 )
                 if component_diagram:
@@ -1707,11 +2116,7 @@ def main():
             old_commit_idx = st.selectbox(
                 "Старый коммит (база для сравнения):",
                 range(len(commits)),
-                format_func=lambda i: (
-                    f"{commits[i]['sha']} - "
-                    f"{commits[i]['message'][:40]}... - "
-                    f"{commits[i]['date'].strftime('%Y-%m-%d')}"
-                ),
+                format_func=lambda i: commits[i]['label'],
                 key="old_commit_selector"
             )
 
@@ -1719,11 +2124,7 @@ def main():
             new_commit_idx = st.selectbox(
                 "Новый коммит (сравниваемый):",
                 range(len(commits)),
-                format_func=lambda i: (
-                    f"{commits[i]['sha']} - "
-                    f"{commits[i]['message'][:40]}... - "
-                    f"{commits[i]['date'].strftime('%Y-%m-%d')}"
-                ),
+                format_func=lambda i: commits[i]['label'],
                 index=0 if len(commits) > 0 else 0,
                 key="new_commit_selector"
             )
@@ -1773,132 +2174,14 @@ def main():
             old_content = st.session_state.old_content
             new_content = st.session_state.new_content
 
-            col_info1, col_info2 = st.columns(2)
-
-            with col_info1:
-                with st.expander(f"Старый коммит: {old_commit['sha']}", expanded=True):
-                    st.metric("Хэш", old_commit['sha'])
-                    st.metric("Автор", old_commit['author'])
-                    st.metric("Дата", old_commit['date'].strftime('%Y-%m-%d %H:%M'))
-                    st.info(f"**Сообщение:** {old_commit['message']}")
-
-                    old_stats = analyze_urdf(old_content)
-                    st.metric("Линков", old_stats['links'])
-                    st.metric("Соединений", old_stats['joints'])
-
-            with col_info2:
-                with st.expander(f"Новый коммит: {new_commit['sha']}", expanded=True):
-                    st.metric("Хэш", new_commit['sha'])
-                    st.metric("Автор", new_commit['author'])
-                    st.metric("Дата", new_commit['date'].strftime('%Y-%m-%d %H:%M'))
-                    st.info(f"**Сообщение:** {new_commit['message']}")
-
-                    new_stats = analyze_urdf(new_content)
-                    st.metric("Линков", new_stats['links'])
-                    st.metric("Соединений", new_stats['joints'])
-
-            st.subheader("Разница в статистике")
-
-            diff_cols = st.columns(4)
-            with diff_cols[0]:
-                diff_links = new_stats['links'] - old_stats['links']
-                st.metric(
-                    "Линков",
-                    new_stats['links'],
-                    delta=f"{diff_links:+d}"
-                )
-
-            with diff_cols[1]:
-                diff_joints = new_stats['joints'] - old_stats['joints']
-                st.metric(
-                    "Соединений",
-                    new_stats['joints'],
-                    delta=f"{diff_joints:+d}"
-                )
-
-            with diff_cols[2]:
-                diff_visuals = new_stats['visuals'] - old_stats['visuals']
-                st.metric(
-                    "Визуалов",
-                    new_stats['visuals'],
-                    delta=f"{diff_visuals:+d}"
-                )
-
-            with diff_cols[3]:
-                diff_collisions = new_stats['collisions'] - old_stats['collisions']
-                st.metric(
-                    "Коллизий",
-                    new_stats['collisions'],
-                    delta=f"{diff_collisions:+d}"
-                )
-
-            changes = analyze_code_changes(old_content, new_content)
-            diff_result = compare_commits(old_content, new_content,
-                                         old_commit['sha'], new_commit['sha'])
-
-            tab1, tab2, tab3 = st.tabs(["Графики изменений", "Diff изменений", "Полный код"])
-
-            with tab1:
-                col_graph1, col_graph2 = st.columns(2)
-
-                with col_graph1:
-                    changes_chart = create_change_stats_chart(changes)
-                    if changes_chart:
-                        st.plotly_chart(changes_chart, use_container_width=True)
-                    else:
-                        st.info("Нет данных для построения графика изменений")
-
-                with col_graph2:
-                    element_chart = create_element_changes_chart(changes)
-                    if element_chart:
-                        st.plotly_chart(element_chart, use_container_width=True)
-                    else:
-                        st.info("Нет изменений элементов URDF")
-
-                if changes:
-                    st.subheader("Детальная статистика изменений")
-
-                    stats_cols = st.columns(4)
-                    with stats_cols[0]:
-                        st.metric("Добавлено строк", changes.get('added_lines', 0))
-                    with stats_cols[1]:
-                        st.metric("Удалено строк", changes.get('removed_lines', 0))
-                    with stats_cols[2]:
-                        st.metric("Изменено строк", changes.get('modified_lines', 0))
-                    with stats_cols[3]:
-                        st.metric("Всего строк", changes.get('unchanged_lines', 0))
-
-                    if changes.get('changes_by_type'):
-                        st.write("**Изменения по элементам URDF:**")
-                        element_changes = changes['changes_by_type']
-                        for elem_type, count in sorted(element_changes.items(), key=lambda x: x[1], reverse=True):
-                            st.write(f"- **{elem_type}**: {count} изменений")
-
-            with tab2:
-                st.subheader("Разница между коммитами")
-                st.caption(f"Сравнение {old_commit['sha']} → {new_commit['sha']}")
-
-                if diff_result:
-                    diff_html = create_diff_html(diff_result)
-                    components.html(diff_html, height=500, scrolling=True)
-                else:
-                    st.info("Нет различий между коммитами или не удалось загрузить данные")
-
-            with tab3:
-                col_code1, col_code2 = st.columns(2)
-
-                with col_code1:
-                    st.subheader(f"Код коммита {old_commit['sha']}")
-                    st.code(old_content, language="xml", line_numbers=True)
-
-                with col_code2:
-                    st.subheader(f"Код коммита {new_commit['sha']}")
-                    st.code(new_content, language="xml", line_numbers=True)
+            render_commit_comparison(old_commit, new_commit, old_content, new_content)
 
         st.divider()
         st.subheader("Временная линия коммитов")
 
-        timeline_fig = create_commit_graph(commits, old_commit_idx if 'old_commit_idx' in locals() else 0)
+        author_colors = get_author_colors(commits) if LIBRARIES.get('plotly') else None
+
+        timeline_fig = create_commit_graph(commits, old_commit_idx, author_colors)
         if timeline_fig:
             st.plotly_chart(timeline_fig, use_container_width=True)
 
@@ -1906,7 +2189,7 @@ def main():
 
         with col_stats1:
             st.subheader("Статистика по авторам")
-            author_stats = create_author_stats(commits)
+            author_stats = create_author_stats(commits, author_colors)
             if isinstance(author_stats, go.Figure):
                 st.plotly_chart(author_stats, use_container_width=True)
             elif author_stats:
@@ -1924,19 +2207,18 @@ def main():
 
         st.subheader("Все коммиты")
 
-        commit_data = []
-        for i, c in enumerate(commits):
-            is_old = "⬅️" if i == (old_commit_idx if 'old_commit_idx' in locals() else -1) else ""
-            is_new = "➡️" if i == (new_commit_idx if 'new_commit_idx' in locals() else -1) else ""
-
-            commit_data.append({
-                "№": i + 1,
-                "Сравнение": f"{is_old} {is_new}".strip(),
-                "Хэш": c['sha'],
-                "Дата": c['date'].strftime('%Y-%m-%d %H:%M'),
-                "Автор": c['author'],
-                "Сообщение": c['message'][:80] + "..." if len(c['message']) > 80 else c['message']
-            })
+        markers = [""] * len(commits)
+        markers[old_commit_idx] = "⬅️"
+        markers[new_commit_idx] = "⬅️ ➡️" if new_commit_idx == old_commit_idx else "➡️"
+
+        commit_data = {
+            "№": list(range(1, len(commits) + 1)),
+            "Сравнение": markers,
+            "Хэш": [c['sha'] for c in commits],
+            "Дата": [c['datetime_str'] for c in commits],
+            "Автор": [c['author'] for c in commits],
+            "Сообщение": [c['table_message'] for c in commits]
+        }
 
         st.dataframe(
             commit_data,
@@ -1955,67 +2237,17 @@ def main():
         st.info("**Начните с выбора источника данных в боковой панели**")
 
         with st.expander("Примеры GitHub репозиториев с URDF"):
-            st.markdown("""
-            ### Популярные репозитории с моделями роботов:
-
-            **Для обучения:**
-            - `https://github.com/ros/urdf_tutorial` - Учебные примеры URDF (рекомендуется)
-            - `https://github.com/ros-industrial/universal_robot` - Промышленные роботы UR
-            - `https://github.com/ros-simulation/gazebo_ros_demos` - Демо для Gazebo
-
-            **Готовые модели:**
-            - `https://github.com/ros-industrial/fanuc` - Роботы Fanuc
-            - `https://github.com/PR2/pr2_common` - PR2 робот
-            - `https://github.com/turtlebot/turtlebot` - TurtleBot
-
-            **Примеры файлов для просмотра:**
-            - `urdf/01-myfirst.urdf` - Простейший робот
-            - `urdf/03-origins.urdf` - Сложная геометрия
-            - `urdf/08-macroed.urdf.xacro` - XACRO файлы
-            """)
+            st.markdown(MD_EXAMPLES)
 
         with st.expander("Статус библиотек"):
-            lib_cols = st.columns(3)
-            for i, (lib_name, is_available) in enumerate(LIBRARIES.items()):
-                with lib_cols[i % 3]:
-                    if is_available:
-                        st.success(f"{lib_name}")
-                    else:
-                        st.error(f"{lib_name}")
-
-            st.info("""
-            **Для полной функциональности (включая 3D):**
-            ```bash
-            pip install streamlit gitpython requests plotly numpy networkx matplotlib PyOpenGL PyOpenGL-accelerate
-            ```
-
-            **Минимальный набор для работы:**
-            ```bash
-            pip install streamlit gitpython requests
-            ```
-            """)
+            st.markdown(LIBRARY_STATUS_MD)
+
+            st.info(MD_INSTALL)
 
         with st.expander("Инструкция"):
-            st.markdown("""
-            1. Вставьте URL GitHub репозитория (например `https://github.com/ros/urdf_tutorial`)
-            2. Нажмите "Найти URDF файлы"
-            3. Выберите файл из списка
-            4. Нажмите "Показать историю коммитов"
-            5. Выберите два коммита для сравнения или один для визуализации
-            """)
+            st.markdown(MD_INSTRUCTIONS)
         with st.expander("Функционал"):
-            st.markdown("""
-            - 3D визуализация URDF моделей в отдельном системном окне
-            - 2D визуализация структуры URDF
-            - Иерархические диаграммы
-            - Статистика компонентов
-            - Сравнение двух коммитов
-            - Графики изменений кода
-            - Анализ по авторам
-            - График частоты коммитов
-            - Diff между коммитами
-            - Полные коды версий для сравненияч
-            """)
+            st.markdown(MD_FEATURES)
 
 if __name__ == "__main__":
     main()